@@ -2,6 +2,7 @@
 """ Reusable utils module."""
 
 __all__ = [
+    "cache",
     "censal",
     "collections",
     "csvs",
@@ -14,6 +15,7 @@ __all__ = [
     "version"]
 
 # BAD PRACTICE: the wildcard is bad but usefull.
+from .cache import *
 from .censal import *
 from .collections import *
 from .csvs import *
@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+"""
+Scrapbag cache file.
+"""
+import os
+import zlib
+import pickle
+import types
+import hashlib
+import functools
+
+import structlog
+
+from .version import __version__
+
+logger = structlog.getLogger(__name__)
+
+# Default max size in bytes of the cache dir
+CACHE_MAX_SIZE = 1024 * 1024 * 1024
+CACHE_EXTENSION = '.pkz'
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class ParseCache():
+    """
+    On disk cache of parse results keyed on the parsed file content, the
+    parse function and its kwargs. Results are stored as zlib compressed
+    pickles and evicted least recently used when the cache dir exceeds
+    max_size bytes, tracking its size across writes to scan the dir only
+    when it may exceed it.
+    Args:
+        :cache_dir: path to the cache dir, created if missing.
+        :max_size: max size in bytes of the cache dir.
+        :fast_hash: identify the file content by its size and mtime
+            instead of hashing it.
+    """
+
+    def __init__(self, cache_dir, max_size=CACHE_MAX_SIZE, fast_hash=False):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.fast_hash = fast_hash
+        # size in bytes of the cache dir, scanned on the first write
+        self._size = None
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, path, func, *args, **kwargs):
+        """
+        Retrieve the cache key of parsing path with func, args and kwargs.
+        """
+        content = hashlib.sha1()
+        content.update(file_token(path, self.fast_hash).encode('utf-8'))
+        content.update(stable_token(
+            [__version__, func, args, kwargs]).encode('utf-8'))
+
+        return '{}-{}'.format(path_token(path), content.hexdigest())
+
+    def get(self, key):
+        """
+        Retrieve (hit, value) of the cache key.
+        """
+        entry_path = self._entry_path(key)
+
+        try:
+            with open(entry_path, 'rb') as entry_file:
+                value = pickle.loads(zlib.decompress(entry_file.read()))
+
+        except FileNotFoundError:
+            return False, None
+
+        except Exception as ex:
+            logger.warning('Fail reading cache entry {} - {}'.format(key, ex))
+            self._remove(entry_path)
+            return False, None
+
+        # mark as recently used, a failure only affects the eviction order
+        try:
+            os.utime(entry_path, None)
+        except OSError:
+            pass
+
+        return True, value
+
+    def set(self, key, value):
+        """
+        Store the value of the cache key evicting the least recently used
+        entries if the cache exceeds its max size.
+        """
+        entry_path = self._entry_path(key)
+        tmp_path = '{}.{}.tmp'.format(entry_path, os.getpid())
+
+        try:
+            data = zlib.compress(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+            # the dir may have been removed since this cache was created
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'wb') as entry_file:
+                entry_file.write(data)
+            replaced_size = self._file_size(entry_path)
+            os.replace(tmp_path, entry_path)
+
+        except Exception as ex:
+            logger.warning('Fail writing cache entry {} - {}'.format(key, ex))
+            self._remove(tmp_path)
+            return
+
+        if self._size is None:
+            self.evict()
+            return
+
+        self._size += len(data) - replaced_size
+        if self._size > self.max_size:
+            self.evict()
+
+    def invalidate(self, path):
+        """
+        Remove the cache entries of the file path, returning how many.
+        """
+        prefix = '{}-'.format(path_token(path))
+        entries = [name for name in self._entries() if name.startswith(prefix)]
+
+        for name in entries:
+            self._remove(os.path.join(self.cache_dir, name))
+
+        # rescan on the next write
+        self._size = None
+
+        return len(entries)
+
+    def clear(self):
+        """
+        Remove all the cache entries.
+        """
+        for name in self._entries():
+            self._remove(os.path.join(self.cache_dir, name))
+
+        self._size = 0
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache fits its max
+        size, updating the tracked size of the cache dir.
+        """
+        entries = []
+        for name in self._entries():
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+            except FileNotFoundError:
+                continue
+
+        total_size = sum(size for _, size, _ in entries)
+
+        for _, size, name in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            self._remove(os.path.join(self.cache_dir, name))
+            total_size -= size
+
+        self._size = total_size
+
+    def _entries(self):
+        """
+        Retrieve the names of the cache entry files.
+        """
+        return [name for name in os.listdir(self.cache_dir)
+                if name.endswith(CACHE_EXTENSION)]
+
+    def _entry_path(self, key):
+        """
+        Retrieve the path to the cache entry file of the key.
+        """
+        return os.path.join(self.cache_dir, key + CACHE_EXTENSION)
+
+    @staticmethod
+    def _file_size(path):
+        """
+        Retrieve the size in bytes of a file, 0 if it doesn't exist.
+        """
+        try:
+            return os.path.getsize(path)
+        except FileNotFoundError:
+            return 0
+
+    @staticmethod
+    def _remove(path):
+        """
+        Remove a file if it still exists.
+        """
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def cached_parse(func):
+    """
+    Decorate a parse function func(filepath, *args, **kwargs) to cache its
+    results when called with a cache kwarg, a ParseCache or a cache dir
+    path. Calls parsing already read rows or with empty results are not
+    cached.
+    """
+    @functools.wraps(func)
+    def wrapper(filepath, *args, **kwargs):
+        cache = kwargs.pop('cache', None)
+
+        if cache is None or kwargs.get('rows'):
+            return func(filepath, *args, **kwargs)
+
+        if not isinstance(cache, ParseCache):
+            cache = _dir_cache(cache)
+
+        try:
+            key = cache.key(filepath, func, *args, **kwargs)
+        except (OSError, ValueError) as ex:
+            logger.warning('Fail building cache key - {}'.format(ex))
+            return func(filepath, *args, **kwargs)
+
+        hit, result = cache.get(key)
+        if not hit:
+            result = func(filepath, *args, **kwargs)
+            if result:
+                cache.set(key, result)
+
+        return result
+
+    return wrapper
+
+
+@functools.lru_cache(maxsize=32)
+def _dir_cache(cache_dir):
+    """
+    Retrieve the ParseCache of the cache dir path, reused between calls to
+    keep its tracked size.
+    """
+    return ParseCache(cache_dir)
+
+
+def path_token(path):
+    """
+    Retrieve the token identifying the file path.
+    """
+    return hashlib.sha1(
+        os.path.abspath(path).encode('utf-8')).hexdigest()[:16]
+
+
+def file_token(path, fast_hash=False):
+    """
+    Retrieve the token identifying the file content, its sha1 or its size and
+    mtime if fast_hash.
+    """
+    if fast_hash:
+        stat = os.stat(path)
+        return 'stat:{}:{}'.format(stat.st_size, stat.st_mtime_ns)
+
+    content = hashlib.sha1()
+    with open(path, 'rb') as content_file:
+        for block in iter(lambda: content_file.read(HASH_BLOCK_SIZE), b''):
+            content.update(block)
+
+    return 'sha1:{}'.format(content.hexdigest())
+
+
+def stable_token(value):
+    """
+    Retrieve a text token of value stable between processes, callables and
+    classes by their qualified name and dicts sorted by key. Raise
+    ValueError for callables without a stable identity, see
+    callable_token.
+    """
+    if isinstance(value, dict):
+        items = sorted(
+            (stable_token(k), stable_token(v)) for k, v in value.items())
+        return '{{{}}}'.format(', '.join(
+            '{}: {}'.format(k, v) for k, v in items))
+
+    elif isinstance(value, (list, tuple)):
+        return '{}[{}]'.format(
+            type(value).__name__, ', '.join(stable_token(v) for v in value))
+
+    elif isinstance(value, (set, frozenset)):
+        return '{}[{}]'.format(
+            type(value).__name__,
+            ', '.join(sorted(stable_token(v) for v in value)))
+
+    elif isinstance(value, functools.partial):
+        return 'partial({}, {}, {})'.format(
+            stable_token(value.func), stable_token(value.args),
+            stable_token(value.keywords))
+
+    elif isinstance(value, type) or callable(value) and \
+            hasattr(value, '__qualname__'):
+        return callable_token(value)
+
+    return repr(value)
+
+
+def callable_token(value):
+    """
+    Retrieve the token of a callable or class by its qualified name and the
+    pickled object of bound methods. Raise ValueError for lambdas, local
+    functions and classes, closures and methods of unpicklable objects, as
+    their name doesn't identify their behavior.
+    """
+    name = '{}.{}'.format(getattr(value, '__module__', ''), value.__qualname__)
+
+    code = getattr(value, '__code__', None)
+    # The __class__ cell of methods calling super() is stable
+    freevars = set(getattr(code, 'co_freevars', ())) - {'__class__'}
+
+    if getattr(value, '__name__', None) == '<lambda>' or \
+            '<locals>' in value.__qualname__ or freevars:
+        raise ValueError('{} has no stable identity'.format(name))
+
+    bound = getattr(value, '__self__', None)
+    if bound is None or isinstance(bound, (type, types.ModuleType)):
+        return name
+
+    try:
+        state = pickle.dumps(bound, pickle.HIGHEST_PROTOCOL)
+    except Exception as ex:
+        raise ValueError('{} has no stable identity - {}'.format(name, ex))
+
+    return '{}@{}'.format(name, hashlib.sha1(state).hexdigest())
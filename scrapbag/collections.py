@@ -2,46 +2,235 @@
 """
 Scrapbag collections file.
 """
+import os
 import re
+import copy
+import itertools
 import collections
-from functools import reduce
-from scrapbag.strings import exclude_chars
+import collections.abc
+import concurrent.futures
+from functools import lru_cache
 
 import structlog
 
 logger = structlog.getLogger(__name__)
 
 
-def exclude_values(values, args):
+# Hashable types never equal to the unhashable excluded values like [] or {}
+SIMPLE_TYPES = {str, bytes, int, float, bool, type(None)}
+
+
+class Exclusion():
+    """
+    Compiled values to exclude from nested lists and dicts. Hashable values
+    are checked in a set and the unhashable ones, like [] or {}, in a small
+    fallback list.
+    """
+
+    def __init__(self, values):
+        self.values = list(values)
+        self.hashable = set()
+        self.unhashable = []
+
+        for value in self.values:
+            try:
+                self.hashable.add(value)
+            except TypeError:
+                self.unhashable.append(value)
+
+    def __contains__(self, item):
+        try:
+            if item in self.hashable:
+                return True
+        except TypeError:
+            return item in self.unhashable
+
+        return type(item) not in SIMPLE_TYPES and item in self.unhashable
+
+    def exclude(self, args, inplace=False):
+        """
+        Exclude the values from args, walking the nested lists and dicts
+        without recursion. The containers are rebuilt as lists and dicts
+        unless inplace, where args containers are modified.
+        """
+        if not isinstance(args, (dict, list)):
+            return args
+
+        if inplace:
+            return self._exclude_inplace(args)
+
+        return self._exclude_copy(args)
+
+    def _exclude_copy(self, args):
+        """
+        Exclude the values from args building new containers.
+        """
+        hashable, unhashable = self.hashable, self.unhashable
+
+        # frames of [result, items iterator, key of the child in process]
+        stack = [[_new_container(args), _iter_items(args), None]]
+
+        while stack:
+            frame = stack[-1]
+            result, items = frame[0], frame[1]
+            child = None
+
+            if isinstance(result, list):
+                append = result.append
+                for value in items:
+                    if type(value) in SIMPLE_TYPES:
+                        if value not in hashable:
+                            append(value)
+                    elif isinstance(value, (dict, list)):
+                        child = value
+                        break
+                    elif value not in self:
+                        append(value)
+
+            else:
+                for key, value in items:
+                    if type(value) in SIMPLE_TYPES:
+                        if value not in hashable:
+                            result[key] = value
+                    elif isinstance(value, (dict, list)):
+                        frame[2], child = key, value
+                        break
+                    elif value not in self:
+                        result[key] = value
+
+            if child is not None:
+                if isinstance(child, dict):
+                    stack.append([{}, iter(child.items()), None])
+                else:
+                    stack.append([[], iter(child), None])
+                continue
+
+            stack.pop()
+            if not stack:
+                return result
+
+            # results are added to the parent once cleaned, containers are
+            # only compared with the unhashable values
+            parent = stack[-1]
+            if result not in unhashable:
+                if isinstance(parent[0], dict):
+                    parent[0][parent[2]] = result
+                else:
+                    parent[0].append(result)
+
+    def _exclude_inplace(self, args):
+        """
+        Exclude the values from args modifying its containers.
+        """
+        hashable, unhashable = self.hashable, self.unhashable
+
+        # frames of [container, items iterator, key of the child in process,
+        # dropped keys of dicts or write position of lists]
+        stack = [[args, _iter_items(args), None, _new_state(args)]]
+
+        while stack:
+            frame = stack[-1]
+            container, items = frame[0], frame[1]
+            child = None
+
+            if isinstance(container, list):
+                position = frame[3]
+                for value in items:
+                    if type(value) in SIMPLE_TYPES:
+                        keep = value not in hashable
+                    elif isinstance(value, (dict, list)):
+                        child = value
+                        break
+                    else:
+                        keep = value not in self
+
+                    if keep:
+                        container[position] = value
+                        position += 1
+                frame[3] = position
+
+            else:
+                for key, value in items:
+                    if type(value) in SIMPLE_TYPES:
+                        keep = value not in hashable
+                    elif isinstance(value, (dict, list)):
+                        frame[2], child = key, value
+                        break
+                    else:
+                        keep = value not in self
+
+                    if not keep:
+                        frame[3].append(key)
+
+            if child is not None:
+                if isinstance(child, dict):
+                    stack.append([child, iter(child.items()), None, []])
+                else:
+                    stack.append([child, iter(child), None, 0])
+                continue
+
+            # drop the excluded items
+            stack.pop()
+            if isinstance(container, dict):
+                for key in frame[3]:
+                    del container[key]
+            else:
+                del container[frame[3]:]
+
+            if not stack:
+                return container
+
+            parent = stack[-1]
+            if isinstance(parent[0], dict):
+                if container in unhashable:
+                    parent[3].append(parent[2])
+            elif container not in unhashable:
+                parent[0][parent[3]] = container
+                parent[3] += 1
+
+
+def _new_container(args):
+    """
+    Retrieve an empty dict or list like args.
+    """
+    return {} if isinstance(args, dict) else []
+
+
+def _new_state(args):
+    """
+    Retrieve the inplace exclusion state of args container, the dropped
+    keys of a dict or the write position of a list.
+    """
+    return [] if isinstance(args, dict) else 0
+
+
+def _iter_items(args):
+    """
+    Iterate over the (key, value) pairs of a dict or the values of a list.
+    """
+    return iter(args.items()) if isinstance(args, dict) else iter(args)
+
+
+def exclude_values(values, args, inplace=False):
     """
     Exclude data with specific value.
     =============   =============   =======================================
     Parameter       Type            Description
     =============   =============   =======================================
-    values          list            values where exclude elements
+    values          list            values where exclude elements, or an
+                                    Exclusion
     args            list or dict    elements to exclude
+    inplace         bool            modify args containers
     =============   =============   =======================================
     Returns: vakues without excluded elements
     """
+    if not isinstance(values, Exclusion):
+        values = Exclusion(values)
 
-    if isinstance(args, dict):
-        return {
-            key: value
-            for key, value in (
-                (k, exclude_values(values, v)) for (k, v) in args.items())
-            if value not in values
-        }
-    elif isinstance(args, list):
-        return [
-            item
-            for item in [exclude_values(values, i) for i in args]
-            if item not in values
-        ]
-
-    return args
+    return values.exclude(args, inplace)
 
 
-def exclude_empty_values(args):
+def exclude_empty_values(args, inplace=False):
     """
     Exclude None, empty strings and empty lists using exclude_values.
     Empry touples positions not included
@@ -49,12 +238,15 @@ def exclude_empty_values(args):
     Parameter       Type            Description
     =============   =============   =======================================
     args            list or dict    elements to exclude
+    inplace         bool            modify args containers
     =============   =============   =======================================
     Returns: values without excluded values introduces and without defined
     empty values.
     """
-    empty_values = ['', 'None', None, [], {}]
-    return exclude_values(empty_values, args)
+    return EMPTY_EXCLUSION.exclude(args, inplace)
+
+
+EMPTY_EXCLUSION = Exclusion(['', 'None', None, [], {}])
 
 
 def check_fields(fields, args):
@@ -69,153 +261,305 @@ def check_fields(fields, args):
     return True
 
 
-def get_element(source, path, separator=r'[/.]'):
-    """
-    Given a dict and path '/' or '.' separated. Digs into de dict to retrieve
-    the specified element.
+# path names excluded as empty values adding elements
+EMPTY_NAMES = ('', 'None')
 
-    Args:
-        source (dict): set of nested objects in which the data will be searched
-        path (string): '/' or '.' string with attribute names
-    """
-    return _get_element_by_names(source, re.split(separator, path))
 
-
-def _get_element_by_names(source, names):
+class CompiledPath():
     """
-    Given a dict and path '/' or '.' separated. Digs into de dict to retrieve
-    the specified element.
-
-    Args:
-        source (dict): set of nested objects in which the data will be searched
-        path (list): list of attribute names
+    Path split in its names with the list indexes already parsed, to get or
+    add elements walking the names without splitting the path again.
     """
+    __slots__ = ('path', 'names', 'indexes', 'steps', 'add_names',
+                 'add_indexes')
+
+    def __init__(self, path, separator=r'[/.]'):
+        self.path = path
+        self.names = tuple(re.split(separator, path))
+        self.indexes = tuple(map(_path_index, self.names))
+        self.steps = tuple(zip(self.names, self.indexes))
+
+        # empty names are not navigated adding elements
+        add_steps = [step for step in self.steps if step[0] not in EMPTY_NAMES]
+        self.add_names = tuple(name for name, _ in add_steps)
+        self.add_indexes = tuple(index for _, index in add_steps)
+
+    def __repr__(self):
+        return 'CompiledPath({!r})'.format(self.path)
+
+    def get(self, source):
+        """
+        Digs into source to retrieve the element in path, like get_element.
+        """
+        for name, index in self.steps:
+            if source is None:
+                return source
+
+            if isinstance(source, dict) and name in source:
+                source = source[name]
+            elif isinstance(source, list) and index is not None:
+                source = source[index]
+            elif not name:
+                return source
+            else:
+                return None
 
-    if source is None:
         return source
 
-    else:
-        if names:
-            head, *rest = names
-            if isinstance(source, dict) and head in source:
-                return _get_element_by_names(source[head], rest)
-            elif isinstance(source, list) and head.isdigit():
-                return _get_element_by_names(source[int(head)], rest)
-            elif not names[0]:
-                pass
-            else:
-                source = None
+    def set(self, source, value, override=False, digit=True):
+        """
+        Add value into source in path, like add_element.
+        """
+        if source is None:
+            return False
+
+        _add_path_value(
+            source, self.add_names, self.add_indexes, value, override, digit)
+
         return source
 
 
-def add_element(source, path, value, separator=r'[/.]', **kwargs):
+@lru_cache(maxsize=1024)
+def _compile_path(path, separator):
     """
-    Add element into a list or dict easily using a path.
-    =============   =============   =======================================
-    Parameter       Type            Description
-    =============   =============   =======================================
-    source          list or dict    element where add the value.
-    path            string          path to add the value in element.
-    value           ¿all?           value to add in source.
-    separator       regex string    Regexp to divide the path.
-    =============   =============   =======================================
-    Returns: source with added value
+    Compile the path, cached by path and separator.
     """
+    return CompiledPath(path, separator)
+
 
-    return _add_element_by_names(
-        source,
-        exclude_empty_values(re.split(separator, path)),
-        value,
-        **kwargs)
+def compile_path(path, separator=r'[/.]'):
+    """
+    Compile a '/' or '.' separated path to get or add elements in nested
+    dicts and lists many times. Compiled paths are returned as they are.
+    """
+    if isinstance(path, CompiledPath):
+        return path
 
+    return _compile_path(path, separator)
 
-def _add_element_by_names(src, names, value, override=False, digit=True):
+
+def _path_index(name):
     """
-    Internal method recursive to Add element into a list or dict easily using
-    a path.
-    =============   =============   =======================================
-    Parameter       Type            Description
-    =============   =============   =======================================
-    src             list or dict    element where add the value.
-    names           list            list with names to navigate in src.
-    value           ¿all?           value to add in src.
-    override        boolean         Override the value in path src.
-    =============   =============   =======================================
-    Returns: src with added value
+    Retrieve the list index of a path name, None if it is not a digit.
     """
+    try:
+        return int(name) if name.isdigit() else None
+    except ValueError:
+        return None
 
-    if src is None:
-        return False
 
-    else:
+def _digit_head(digit):
+    """
+    Retrieve if digit names are list indexes in the current path level,
+    digit is a bool or a list of bools by level.
+    """
+    if digit is True or digit is False:
+        return digit
+
+    return force_list(digit)[0]
+
 
-        if names and names[0]:
-            head, *rest = names
+def _add_path_value(src, names, indexes, value, override=False, digit=True,
+                    start=0, containers=None):
+    """
+    Walk names from the start level of src creating the missing containers
+    and add value in the last one, appending the container of each level to
+    containers if given.
+    """
+    last = len(names) - 1
 
-            # list and digit head
-            if isinstance(src, list):
-                if force_list(digit)[0] and head.isdigit():
-                    head = int(head)
+    if start and isinstance(digit, list):
+        digit = digit[start:]
 
-                    # if src is a list and lenght <= head
-                    if len(src) <= head:
-                        src.extend([""] * (head + 1 - len(src)))
+    for position in range(start, last + 1):
+        head = names[position]
+        next_index = indexes[position + 1] if position < last else None
 
-            # head not in src :(
-            elif isinstance(src, dict):
-                if head not in src:
-                    src[head] = [""] * (int(rest[0]) + 1) if rest and force_list(digit)[0] and rest[0].isdigit() else {}
+        if containers is not None:
+            containers.append(src)
 
-            # more heads in rest
-            if rest:
+        # list and digit head
+        if isinstance(src, list):
+            if _digit_head(digit) and indexes[position] is not None:
+                head = indexes[position]
 
-                # Head find but isn't a dict or list to navigate for it.
-                if not isinstance(src[head], (dict, list)):
+                # if src is a list and lenght <= head
+                if len(src) <= head:
+                    src.extend([""] * (head + 1 - len(src)))
 
-                    # only could be str for dict or int for list
-                    src[head] = [""] * (int(rest[0]) + 1) if force_list(digit)[0] and rest[0].isdigit() else {}
+        # head not in src :(
+        elif isinstance(src, dict):
+            if head not in src:
+                src[head] = [""] * (next_index + 1) \
+                    if position < last and _digit_head(digit) and \
+                    next_index is not None else {}
 
-                    digit = digit if not digit or not isinstance(digit, list) else digit[1:]
+        # it's final head
+        if position == last:
+            _set_path_value(src, head, value, override)
+            break
 
-                    if not force_list(digit)[0] and rest and str(rest[0]).isdigit() and isinstance(src[head], list) and override:
-                        src[head] = {}
+        # Head find but isn't a dict or list to navigate for it.
+        if not isinstance(src[head], (dict, list)):
 
-                    _add_element_by_names(src[head], rest, value, override=override, digit=digit)
+            # only could be str for dict or int for list
+            src[head] = [""] * (next_index + 1) \
+                if _digit_head(digit) and next_index is not None else {}
 
-                else:
+        digit = digit if not digit or not isinstance(digit, list) \
+            else digit[1:]
 
-                    digit = digit if not digit or not isinstance(digit, list) else digit[1:]
+        if not _digit_head(digit) and next_index is not None and \
+                isinstance(src[head], list) and override:
+            src[head] = {}
 
-                    if not force_list(digit)[0] and rest and str(rest[0]).isdigit() and isinstance(src[head], list) and override:
-                        src[head] = {}
+        src = src[head]
 
-                    _add_element_by_names(src[head], rest, value, override=override, digit=digit)
 
-            # it's final head
+def _set_path_value(src, head, value, override):
+    """
+    Set the value in the final head of a path, appending to lists or
+    updating dicts unless override.
+    """
+    if not override:
+
+        if isinstance(src, list) and isinstance(head, int):
+
+            if src[head] == '':
+                src[head] = value
             else:
+                src.append(value)
 
-                if not override:
+        elif isinstance(src[head], list):
+            src[head].append(value)
 
-                    if isinstance(src, list) and isinstance(head, int):
+        elif isinstance(src[head], dict) and isinstance(value, dict):
+            src[head].update(value)
 
-                        if src[head] == '':
-                            src[head] = value
-                        else:
-                            src.append(value)
+        else:
+            src[head] = value
 
-                    elif isinstance(src[head], list):
-                        src[head].append(value)
+    else:
+        src[head] = value
 
-                    elif isinstance(src[head], dict) and isinstance(value, dict):
-                        src[head].update(value)
 
-                    else:
-                        src[head] = value
+def get_element(source, path, separator=r'[/.]'):
+    """
+    Given a dict and path '/' or '.' separated. Digs into de dict to retrieve
+    the specified element.
 
-                else:
-                    src[head] = value
+    Args:
+        source (dict): set of nested objects in which the data will be searched
+        path (string or CompiledPath): '/' or '.' string with attribute names
+    """
+    return compile_path(path, separator).get(source)
 
-        return src
+
+def add_element(source, path, value, separator=r'[/.]', **kwargs):
+    """
+    Add element into a list or dict easily using a path.
+    =============   =============   =======================================
+    Parameter       Type            Description
+    =============   =============   =======================================
+    source          list or dict    element where add the value.
+    path            string or       path to add the value in element.
+                    CompiledPath
+    value           ¿all?           value to add in source.
+    separator       regex string    Regexp to divide the path.
+    =============   =============   =======================================
+    Returns: source with added value
+    """
+    return compile_path(path, separator).set(source, value, **kwargs)
+
+
+class NestedBuilder():
+    """
+    Build nested dicts and lists adding (path, value) pairs in order, with
+    the same result as calling add_element for each pair. Each path resumes
+    from the containers it shares with the previous one, so the common
+    prefixes of grouped paths are only walked once. The built source should
+    not be modified elsewhere while adding.
+    """
+
+    def __init__(self, source=None, separator=r'[/.]', override=False,
+                 digit=True):
+        self.source = {} if source is None else source
+        self.separator = re.compile(separator)
+        self.override = override
+        self.digit = digit
+
+        # names and level containers of the last added path
+        self._names = ()
+        self._containers = []
+
+    def add(self, path, value):
+        """
+        Add value into the source in path, like add_element. The path could
+        also be a list of names.
+        """
+        names, indexes = self._split(path)
+        last_names = self._names
+
+        # common prefix with the last path, its last level is walked again
+        common = 0
+        for name, last_name in zip(names, last_names):
+            if name != last_name:
+                break
+            common += 1
+
+        start = max(min(common, len(names)) - 1, 0)
+        containers = self._containers
+        src = containers[start] if start else self.source
+        del containers[start:]
+
+        self._names = ()
+        _add_path_value(
+            src, names, indexes, value, self.override, self.digit,
+            start=start, containers=containers)
+        self._names = names
+
+        return self.source
+
+    def _split(self, path):
+        """
+        Retrieve the names of path navigated adding elements and their list
+        indexes.
+        """
+        if isinstance(path, CompiledPath):
+            return path.add_names, path.add_indexes
+
+        if isinstance(path, (list, tuple)):
+            names = [name for name in path if name not in EMPTY_NAMES]
+            return names, [
+                _path_index(name) if isinstance(name, str) else None
+                for name in names]
+
+        names = [name for name in self.separator.split(path)
+                 if name not in EMPTY_NAMES]
+
+        return names, list(map(_path_index, names))
+
+    def update(self, pairs):
+        """
+        Add the (path, value) pairs of an iterable or a dict.
+        """
+        if isinstance(pairs, collections.abc.Mapping):
+            pairs = pairs.items()
+
+        for path, value in pairs:
+            self.add(path, value)
+
+        return self.source
+
+
+def unflatten(pairs, sep='_', source=None, **kwargs):
+    """
+    Transform the (key, value) pairs of a one level dict or iterable into
+    multilevel values splitting the keys by sep, the inverse of flatten.
+    Digit keys are list indexes unless digit=False, see add_element.
+    """
+    builder = NestedBuilder(source, separator=re.escape(sep), **kwargs)
+    return builder.update(pairs)
 
 
 def format_dict(dic, format_list, separator=',', default_value=str):
@@ -247,36 +591,83 @@ def force_list(element):
 
 
 def simplify_collection(element, force_list=False, empty_values=['', 'None', None, [], {}], **kwargs):
-
+    """
+    Simplify nested lists and dicts excluding the empty values and the
+    containers left empty, and replacing the lists of one element by the
+    element unless force_list. Each container is rebuilt once, bottom-up
+    and without recursion.
+    """
     # if None
     if element is None:
         return None
 
-    if isinstance(element, dict):
-        element = {
-            key: value
-            for key, value in (
-                (k, simplify_collection(
-                    element=v,
-                    force_list=force_list,
-                    empty_values=empty_values)) for (k, v) in element.items())
-        }
+    if not isinstance(element, (dict, list, collections.abc.Iterator)):
+        return element
+
+    if not isinstance(empty_values, Exclusion):
+        empty_values = Exclusion(empty_values)
+
+    hashable, unhashable = empty_values.hashable, empty_values.unhashable
+
+    # frames of [result, items iterator, key of the child in process]
+    stack = [[_new_container(element), _iter_items(element), None]]
 
-    # if list or tuple or collection iterable
-    elif isinstance(element, (collections.Iterator, list)):
-        element = exclude_values(empty_values, element)
+    while stack:
+        frame = stack[-1]
+        result, items = frame[0], frame[1]
+        child = None
 
-        # simplify each sub_element in element
-        for i in range(0, len(element)):
-            element[i] = simplify_collection(
-                element=exclude_values(empty_values, element[i]),
-                force_list=force_list,
-                empty_values=empty_values)
+        if isinstance(result, list):
+            append = result.append
+            for value in items:
+                if type(value) in SIMPLE_TYPES:
+                    if value not in hashable:
+                        append(value)
+                elif _is_collection(value):
+                    child = value
+                    break
+                elif value not in empty_values:
+                    append(value)
+
+        else:
+            for key, value in items:
+                if type(value) in SIMPLE_TYPES:
+                    if value not in hashable:
+                        result[key] = value
+                elif _is_collection(value):
+                    frame[2], child = key, value
+                    break
+                elif value not in empty_values:
+                    result[key] = value
+
+        if child is not None:
+            stack.append([_new_container(child), _iter_items(child), None])
+            continue
+
+        stack.pop()
+
+        if not force_list and isinstance(result, list) and len(result) == 1:
+            result = result[0]
+
+        if not stack:
+            return result
+
+        # simplified containers are only compared with the unhashable values
+        if isinstance(result, (dict, list)) and result in unhashable:
+            continue
+
+        parent = stack[-1]
+        if isinstance(parent[0], dict):
+            parent[0][parent[2]] = result
+        else:
+            parent[0].append(result)
 
-        if not force_list and len(element) == 1:
-            element = element[0]
 
-    return exclude_values(empty_values, element)
+def _is_collection(value):
+    """
+    Check if value is a dict, list or iterator to simplify.
+    """
+    return isinstance(value, (dict, list, collections.abc.Iterator))
 
 
 def chunks(lista, size):
@@ -289,111 +680,429 @@ def chunks(lista, size):
         yield lista[i:i + size]
 
 
+def chunked(iterable, size):
+    """
+    Yield successive lists of size elements of any iterable, holding one
+    chunk at a time.
+    """
+    if size < 1:
+        raise ValueError('Chunk size must be positive, not {}'.format(size))
+
+    iterator = iter(iterable)
+
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+
+        yield chunk
+
+
+def parallel_map_chunks(func, iterable, size, executor='thread', workers=None,
+                        ordered=True):
+    """
+    Yield func(chunk) of the size chunks of iterable, run in a pool of
+    workers with at most two chunks per worker in flight.
+    Args:
+        :executor: 'thread', 'process' or a concurrent.futures executor,
+            processes need a picklable func.
+        :workers: number of workers, by default the number of cpus.
+        :ordered: yield the results in the chunks order instead of as they
+            are completed.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks_iter = chunked(iterable, size)
+
+    # one worker is not worth the pool
+    if workers < 2 and executor in PARALLEL_EXECUTORS:
+        for chunk in chunks_iter:
+            yield func(chunk)
+        return
+
+    if executor in PARALLEL_EXECUTORS:
+        with PARALLEL_EXECUTORS[executor](max_workers=workers) as pool:
+            yield from _map_chunks(func, chunks_iter, pool, workers, ordered)
+
+    else:
+        yield from _map_chunks(func, chunks_iter, executor, workers, ordered)
+
+
+def _map_chunks(func, chunks_iter, pool, workers, ordered=True):
+    """
+    Yield func(chunk) of each chunk submitted to the pool, keeping a bounded
+    amount of chunks in flight.
+    """
+    pending = collections.deque()
+
+    try:
+        for chunk in chunks_iter:
+            pending.append(pool.submit(func, chunk))
+
+            # keep a bounded amount of chunks in flight
+            if len(pending) >= workers * 2:
+                yield from _pop_results(pending, ordered)
+
+        while pending:
+            yield from _pop_results(pending, ordered)
+
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _pop_results(pending, ordered=True):
+    """
+    Pop the results of the first pending future, or of the completed ones
+    if not ordered.
+    """
+    if ordered:
+        return [pending.popleft().result()]
+
+    done, _ = concurrent.futures.wait(
+        pending, return_when=concurrent.futures.FIRST_COMPLETED)
+
+    results = []
+    for future in list(pending):
+        if future in done:
+            pending.remove(future)
+            results.append(future.result())
+
+    return results
+
+
+PARALLEL_EXECUTORS = {
+    'thread': concurrent.futures.ThreadPoolExecutor,
+    'process': concurrent.futures.ProcessPoolExecutor
+}
+
+
 def flatten(data, parent_key='', sep='_'):
     """
     Transform dictionary multilevel values to one level dict, concatenating
     the keys with sep between them.
     """
-    items = []
+    if not isinstance(data, (dict, list)):
+        logger.debug('Nothing to flatten', data=data)
+        return data
 
-    if isinstance(data, list):
-        logger.debug('Flattening list {}'.format(data))
-        list_keys = [str(i) for i in range(0, len(data))]
-        items.extend(
-            flatten(dict(zip(list_keys, data)), parent_key, sep=sep).items())
+    return collections.OrderedDict(iter_flatten(data, parent_key, sep=sep))
 
-    elif isinstance(data, dict):
-        logger.debug('Flattening dict {}'.format(data))
 
-        for key, value in data.items():
-            new_key = parent_key + sep + key if parent_key else key
-            if isinstance(value, collections.MutableMapping):
-                items.extend(flatten(value, new_key, sep=sep).items())
+def iter_flatten(data, parent_key='', sep='_'):
+    """
+    Walk dictionary multilevel values without recursion, yielding the
+    (key, value) pairs of flatten. Keys of list values are their indexes.
+    Only one debug message is logged per call, without the data, so
+    rendering it doesn't depend on the size or depth of the data.
+    """
+    if not isinstance(data, (dict, list)):
+        return
+
+    logger.debug('Flattening', type=type(data).__name__, size=len(data))
+
+    # frames of (parent key, (key, value) iterator)
+    stack = [(parent_key, _iter_flatten_items(data))]
+
+    while stack:
+        parent, items = stack[-1]
+
+        for key, value in items:
+            new_key = parent + sep + key if parent else key
+
+            if isinstance(value, collections.abc.MutableMapping):
+                if isinstance(value, dict):
+                    stack.append((new_key, _iter_flatten_items(value)))
+                    break
+
+                # other mappings are not flattened
+                yield from value.items()
+
+            elif isinstance(value, list):
+                stack.append((new_key, _iter_flatten_items(value)))
+                break
+
             else:
-                if isinstance(value, list):
-                    list_keys = [str(i) for i in range(0, len(value))]
-                    items.extend(
-                        flatten(
-                            dict(zip(list_keys, value)), new_key, sep=sep).items())
-                else:
-                    items.append((new_key, value))
-    else:
-        logger.debug('Nothing to flatten with {}'.format(data))
-        return data
+                yield new_key, value
 
-    return collections.OrderedDict(items)
+        else:
+            stack.pop()
+
+
+def _iter_flatten_items(data):
+    """
+    Iterate over the (key, value) of a dict or the (index, value) of a list
+    with the index as str.
+    """
+    if isinstance(data, dict):
+        return iter(data.items())
+
+    return zip(map(str, itertools.count()), data)
 
 
 def merge_dicts(base_dict, merge_dict, **kwargs):
-    result = {}
+    """
+    Merge merge_dict into base_dict adding each of its values like
+    add_element, see deep_merge.
+    """
+    return deep_merge(base_dict, merge_dict, inplace=True, **kwargs)
 
-    if isinstance(base_dict, dict) and isinstance(merge_dict, dict):
 
-        f_merge_dict = flatten(merge_dict, sep='/')
+def deep_merge(base_dict, merge_dict, lists='add', inplace=False, **kwargs):
+    """
+    Merge merge_dict into base_dict walking both once, merging nested dicts
+    and the lists by the lists strategy:
+        add: add each value of merge_dict like add_element with the override
+            and digit kwargs, as merge_dicts.
+        append: extend the base lists with the merge lists.
+        replace: replace the base lists with the merge lists.
+        index: merge the lists item by item.
+        callable(base_list, merge_list): retrieve the merged list.
+    Other values of merge_dict replace the base ones. base_dict is copied
+    unless inplace, the values of merge_dict are not copied.
+    """
+    if not isinstance(base_dict, dict) or not isinstance(merge_dict, dict):
+        logger.error('Arguments dicts are not dicts',
+                     base_dict=base_dict, merge_dict=merge_dict)
+        return {}
 
-        for k in f_merge_dict.keys():
-            add_element(base_dict, k, get_element(merge_dict, k), **kwargs)
+    if not inplace:
+        base_dict = copy.deepcopy(base_dict)
 
-        result = base_dict
+    if lists == 'add':
+        NestedBuilder(base_dict, **kwargs).update(_iter_leaves(merge_dict))
 
     else:
-        logger.error('Arguments dicts are not dicts', base_dict=base_dict, merge_dict=merge_dict)
+        merge_lists = LIST_MERGE_STRATEGIES.get(lists, lists)
 
-    return result
+        if not callable(merge_lists) and lists != 'index':
+            logger.error('Unknown lists merge strategy', lists=lists)
+            return {}
+
+        _merge_trees(
+            base_dict, merge_dict, merge_lists if lists != 'index' else None)
+
+    return base_dict
+
+
+def _iter_leaves(data):
+    """
+    Walk dictionary multilevel values without recursion, yielding the names
+    to each value that is not a dict or list, with list indexes as str.
+    """
+    stack = [((), _iter_flatten_items(data))]
+
+    while stack:
+        names, items = stack[-1]
+
+        for key, value in items:
+            if isinstance(value, (dict, list)):
+                stack.append((names + (key,), _iter_flatten_items(value)))
+                break
+
+            yield names + (key,), value
+
+        else:
+            stack.pop()
+
+
+def _merge_trees(base, merge, merge_lists=None):
+    """
+    Merge the merge dict or list into base walking both, merging lists by
+    index if merge_lists is None.
+    """
+    stack = [(base, merge)]
+
+    while stack:
+        dst, src = stack.pop()
+        is_list = isinstance(dst, list)
+
+        for key, value in enumerate(src) if is_list else src.items():
+
+            if is_list and key >= len(dst):
+                dst.append(value)
+                continue
+
+            elif not is_list and key not in dst:
+                dst[key] = value
+                continue
+
+            current = dst[key]
+
+            if isinstance(current, dict) and isinstance(value, dict):
+                stack.append((current, value))
+
+            elif isinstance(current, list) and isinstance(value, list):
+                if merge_lists is None:
+                    stack.append((current, value))
+                else:
+                    dst[key] = merge_lists(current, value)
+
+            else:
+                dst[key] = value
+
+
+def _append_lists(base_list, merge_list):
+    """
+    Extend the base list with the merge list.
+    """
+    base_list.extend(merge_list)
+    return base_list
+
+
+def _replace_lists(base_list, merge_list):
+    """
+    Replace the base list with the merge list.
+    """
+    return merge_list
+
+
+LIST_MERGE_STRATEGIES = {
+    'append': _append_lists,
+    'replace': _replace_lists
+}
 
 
 def nested_dict_to_list(path, dic, exclusion=None):
     """
     Transform nested dict to list
     """
-    result = []
+    return list(iter_nested_rows(path, dic, exclusion))
+
+
+def iter_nested_rows(path, dic, exclusion=None):
+    """
+    Walk nested dict without recursion yielding the [path, key, value] rows
+    of nested_dict_to_list. The exclusion applies to the first level keys,
+    the nested ones exclude '__self'.
+    """
     exclusion = ['__self'] if exclusion is None else exclusion
 
-    for key, value in dic.items():
+    # frames of [path, (key, value) iterator, exclusion]
+    stack = [[path, iter(dic.items()), exclusion]]
 
-        if not any([exclude in key for exclude in exclusion]):
-            if isinstance(value, dict):
-                aux = path + key + "/"
-                result.extend(nested_dict_to_list(aux, value))
-            else:
-                if path.endswith("/"):
-                    path = path[:-1]
+    while stack:
+        frame = stack[-1]
+        items, exclusion = frame[1], frame[2]
 
-                result.append([path, key, value])
+        for key, value in items:
 
-    return result
+            if not any([exclude in key for exclude in exclusion]):
+                if isinstance(value, dict):
+                    stack.append([
+                        frame[0] + key + "/", iter(value.items()),
+                        ['__self']])
+                    break
+
+                # the path of the following keys in this level loses the /
+                if frame[0].endswith("/"):
+                    frame[0] = frame[0][:-1]
+
+                yield [frame[0], key, value]
+
+        else:
+            stack.pop()
 
 
 def find_value_in_object(attr, obj):
     """Return values for any key coincidence with attr in obj or any other
     nested dict.
     """
+    for _, value in _iter_found_values({attr}, obj):
+        yield value
 
-    # Carry on inspecting inside the list or tuple
-    if isinstance(obj, (collections.Iterator, list)):
-        for item in obj:
-            yield from find_value_in_object(attr, item)
 
-    # Final object (dict or entity) inspect inside
-    elif isinstance(obj, collections.Mapping):
+def find_values_in_object(attrs, obj, max_depth=None, max_matches=None):
+    """
+    Retrieve a dict of each attr in attrs to the list of its values in obj
+    or any other nested dict, like find_value_in_object, walking obj once.
+    Containers nested deeper than max_depth are not inspected and each attr
+    stops matching after max_matches values.
+    """
+    attrs = {attrs} if isinstance(attrs, str) else set(attrs)
+    result = {attr: [] for attr in attrs}
 
-        # If result is found, inspect inside and return inner results
-        if attr in obj:
+    if max_matches is not None and max_matches < 1:
+        return result
 
-            # If it is iterable, just return the inner elements (avoid nested
-            # lists)
-            if isinstance(obj[attr], (collections.Iterator, list)):
-                for item in obj[attr]:
-                    yield item
+    for attr, value in _iter_found_values(attrs, obj, max_depth):
+        if attr not in attrs:
+            continue
 
-            # If not, return just the objects
-            else:
-                yield obj[attr]
+        matches = result[attr]
+        matches.append(value)
+
+        if max_matches is not None and len(matches) >= max_matches:
+            attrs.discard(attr)
+
+            if not attrs:
+                break
+
+    return result
+
+
+def _iter_found_values(attrs, obj, max_depth=None):
+    """
+    Walk obj without recursion yielding (attr, value) of the values of any
+    key in attrs, the items of list values. attrs could be reduced while
+    walking to stop matching them.
+    """
+    # frames of (depth, iterator of the nested objects)
+    stack = [(0, iter((obj,)))]
 
-        # Carry on inspecting inside the object
-        for item in obj.values():
-            if item:
-                yield from find_value_in_object(attr, item)
+    while stack:
+        depth, items = stack[-1]
+
+        for item in items:
+            item_type = type(item)
+
+            if item_type in SIMPLE_TYPES:
+                continue
+
+            # Carry on inspecting inside the list or tuple
+            elif item_type is list or item_type is not dict and \
+                    isinstance(item, (collections.abc.Iterator, list)):
+                if max_depth is None or depth <= max_depth:
+                    stack.append((depth + 1, iter(item)))
+                    break
+
+            # Final object (dict or entity) inspect inside
+            elif item_type is dict or \
+                    isinstance(item, collections.abc.Mapping):
+                if max_depth is not None and depth > max_depth:
+                    continue
+
+                for attr in _found_attrs(attrs, item):
+                    value = item[attr]
+
+                    # If it is iterable, just return the inner elements
+                    # (avoid nested lists)
+                    if isinstance(value, (collections.abc.Iterator, list)):
+                        for inner in value:
+                            yield attr, inner
+
+                    # If not, return just the objects
+                    else:
+                        yield attr, value
+
+                if not attrs:
+                    return
+
+                # Carry on inspecting inside the object
+                stack.append((depth + 1, filter(None, item.values())))
+                break
+
+        else:
+            stack.pop()
+
+
+def _found_attrs(attrs, mapping):
+    """
+    Retrieve the attrs that are keys of mapping.
+    """
+    if len(mapping) < len(attrs):
+        return [key for key in mapping if key in attrs]
+
+    return [attr for attr in attrs if attr in mapping]
 
 
 def remove_list_duplicates(lista, unique=False):
@@ -401,21 +1110,95 @@ def remove_list_duplicates(lista, unique=False):
     Remove duplicated elements in a list.
     Args:
         lista: List with elements to clean duplicates.
+        unique: Remove every element with duplicates.
     """
-    result = []
-    allready = []
+    if not unique:
+        return list(iter_unique(lista))
+
+    elements = list(_iter_unique_keys(lista))
+    counts = collections.Counter(key for _, key in elements)
+
+    return [elem for elem, key in elements if counts[key] == 1]
+
+
+def iter_unique(iterable):
+    """
+    Yield the elements of iterable in order skipping the ones equal to an
+    already yielded element. Dicts, lists and sets are compared by their
+    content.
+    """
+    seen = set()
+
+    for elem, key in _iter_unique_keys(iterable):
+        if key not in seen:
+            seen.add(key)
+            yield elem
+
+
+# markers of the canonical keys of unhashable elements
+_DICT_KEY = object()
+_LIST_KEY = object()
+_OTHER_KEY = object()
+
 
-    for elem in lista:
-        if elem not in result:
-            result.append(elem)
+def _iter_unique_keys(iterable):
+    """
+    Yield (element, key) of the iterable elements, with equal keys for
+    equal elements. Hashable elements are their own key, dicts, lists and
+    sets get a canonical key of their content and other unhashable elements
+    the position of the first equal one between them.
+    """
+    others = []
+
+    for elem in iterable:
+        try:
+            hash(elem)
+            yield elem, elem
+            continue
+        except TypeError:
+            pass
+
+        try:
+            yield elem, _canonical_key(elem)
+            continue
+        except TypeError:
+            pass
+
+        for index, other in enumerate(others):
+            if other == elem:
+                break
         else:
-            allready.append(elem)
+            index = len(others)
+            others.append(elem)
 
-    if unique:
-        for elem in allready:
-            result = list(filter((elem).__ne__, result))
+        yield elem, (_OTHER_KEY, index)
 
-    return result
+
+def _canonical_key(elem):
+    """
+    Retrieve a hashable key of elem equal for equal elements, raising
+    TypeError if elem has no canonical key.
+    """
+    try:
+        hash(elem)
+        return elem
+    except TypeError:
+        pass
+
+    if isinstance(elem, collections.abc.Mapping):
+        return _DICT_KEY, frozenset(
+            (key, _canonical_key(value)) for key, value in elem.items())
+
+    elif isinstance(elem, (set, frozenset)):
+        return frozenset(elem)
+
+    elif isinstance(elem, list):
+        return _LIST_KEY, tuple(map(_canonical_key, elem))
+
+    elif isinstance(elem, tuple):
+        return tuple(map(_canonical_key, elem))
+
+    raise TypeError('unhashable type: {}'.format(type(elem).__name__))
 
 
 def dict2orderedlist(dic, order_list, default='', **kwargs):
@@ -429,6 +1212,67 @@ def dict2orderedlist(dic, order_list, default='', **kwargs):
     return result
 
 
+def project_records(records, order_list, default='', columnar=False,
+                    **kwargs):
+    """
+    Project many records like dict2orderedlist, compiling the paths once.
+    Yields the rows, or returns a list with the column of each path if
+    columnar, preallocated when the number of records is known.
+    =============   =============   =======================================
+    Parameter       Type            Description
+    =============   =============   =======================================
+    records         iterable        dicts to project.
+    order_list      list            paths or compiled paths of the values.
+    default         ¿all?           value of the paths not found.
+    columnar        boolean         return columns instead of rows.
+    separator       regex string    Regexp to divide the paths.
+    =============   =============   =======================================
+    """
+    rows = _iter_projected_rows(records, order_list, default, **kwargs)
+
+    if not columnar:
+        return rows
+
+    try:
+        columns = [[default] * len(records) for _ in order_list]
+    except TypeError:
+        # records of unknown length fill growing columns
+        columns = [[] for _ in order_list]
+        for row in rows:
+            for column, value in zip(columns, row):
+                column.append(value)
+        return columns
+
+    for r_index, row in enumerate(rows):
+        for column, value in zip(columns, row):
+            column[r_index] = value
+
+    return columns
+
+
+def _iter_projected_rows(records, order_list, default='', separator=r'[/.]'):
+    """
+    Yield the records projected to rows of the order_list paths values.
+    """
+    paths = [compile_path(path, separator) for path in order_list]
+    getters = [path.get for path in paths]
+
+    # single name paths of dict records are taken with dict.get
+    keys = [path.names[0] for path in paths]
+    simple = all(len(path.names) == 1 and path.names[0] for path in paths)
+
+    for record in records:
+        if simple and isinstance(record, dict):
+            row = list(map(record.get, keys))
+        else:
+            row = [getter(record) for getter in getters]
+
+        if default is not None:
+            row = [default if value is None else value for value in row]
+
+        yield row
+
+
 def get_dimension(data):
     """
     Get dimension of the data passed by argument independently if it's an
@@ -478,60 +1322,499 @@ def get_ldict_keys(ldict, flatten_keys=False, **kwargs):
     """
     Get first level keys from a list of dicts
     """
-    result = []
-    for ddict in ldict:
-        if isinstance(ddict, dict):
+    schema = SchemaAccumulator(flatten_keys=flatten_keys, **kwargs)
+    return schema.update(ldict).keys()
+
 
-            if flatten_keys:
-                ddict = flatten(ddict, **kwargs)
+# Records accumulated at once by SchemaAccumulator
+SCHEMA_BATCH_SIZE = 1024
+
+
+class SchemaAccumulator():
+    """
+    Schema of a stream of dict records, accumulating the keys in first seen
+    order, the number of records with each key and the types of its values.
+    Records that are not dicts are skipped. Accumulators of other processes
+    could be merged, as they are picklable.
+    Args:
+        :flatten_keys: accumulate the keys of the flattened records.
+        :kwargs: flatten kwargs, parent_key and sep.
+    """
 
-            result.extend(ddict.keys())
-    return list(set(result))
+    def __init__(self, flatten_keys=False, **kwargs):
+        self.flatten_keys = flatten_keys
+        self.flatten_kwargs = kwargs
+
+        self.records = 0
+        self.counts = collections.Counter()
+
+        # keys in first seen order and the seen (key, value type) pairs
+        self._keys = []
+        self._seen = set()
+        self._key_types = set()
+
+    def add(self, record):
+        """
+        Accumulate the keys of a record.
+        """
+        return self.update((record,))
+
+    def update(self, records):
+        """
+        Accumulate the keys of an iterable of records, counting them by
+        batches.
+        """
+        records = iter(records)
+
+        while True:
+            batch = list(itertools.islice(records, SCHEMA_BATCH_SIZE))
+
+            if not batch:
+                break
+
+            batch = [record for record in batch if isinstance(record, dict)]
+
+            if self.flatten_keys:
+                batch = [dict(iter_flatten(record, **self.flatten_kwargs))
+                         for record in batch]
+
+            keys = list(itertools.chain.from_iterable(batch))
+            values = itertools.chain.from_iterable(map(dict.values, batch))
+
+            self.records += len(batch)
+            self.counts.update(keys)
+            self._key_types.update(zip(keys, map(type, values)))
+
+            if not self._seen.issuperset(keys):
+                self._add_keys(keys)
+
+        return self
+
+    def merge(self, other):
+        """
+        Accumulate the schema of other accumulator, its new keys after the
+        known ones.
+        """
+        self.records += other.records
+        self.counts.update(other.counts)
+        self._key_types.update(other._key_types)
+        self._add_keys(other._keys)
+
+        return self
+
+    def keys(self):
+        """
+        Retrieve the keys in first seen order.
+        """
+        return list(self._keys)
+
+    @property
+    def types(self):
+        """
+        Dict of each key to the set of its value types.
+        """
+        types = {key: set() for key in self._keys}
+        for key, value_type in self._key_types:
+            types[key].add(value_type)
+
+        return types
+
+    def _add_keys(self, keys):
+        """
+        Add the not seen keys in order.
+        """
+        for key in keys:
+            if key not in self._seen:
+                self._seen.add(key)
+                self._keys.append(key)
 
 
 def get_alldictkeys(ddict, parent=None):
     """
     Get all keys in a dict
     """
-    parent = [] if parent is None else parent
+    return list(iter_dictkeys(ddict, parent))
+
+
+def iter_dictkeys(ddict, parent=None):
+    """
+    Walk nested dict without recursion yielding the tuple of keys to each
+    value that is not a dict, prefixed by the parent keys.
+    """
+    parent = () if parent is None else tuple(parent)
 
     if not isinstance(ddict, dict):
-        return [tuple(parent)]
-    return reduce(
-        list.__add__,
-        [get_alldictkeys(v, parent + [k]) for k, v in ddict.items()],
-        [])
+        yield parent
+        return
+
+    # frames of (keys, (key, value) iterator)
+    stack = [(parent, iter(ddict.items()))]
+
+    while stack:
+        keys, items = stack[-1]
+
+        for key, value in items:
+            if isinstance(value, dict):
+                stack.append((keys + (key,), iter(value.items())))
+                break
+
+            yield keys + (key,)
+
+        else:
+            stack.pop()
+
+
+class PathIndex():
+    """
+    Index of the paths of a nested document of dicts and lists, built once
+    to lookup the values by their sep joined path, the paths containing
+    each key name and the values under a path prefix without walking the
+    whole document again. List indexes are path names too, as in
+    get_element. The document should only be modified through set and
+    delete while indexed.
+    Args:
+        :document: nested dicts and lists to index.
+        :sep: separator joining the path names.
+    """
+
+    def __init__(self, document, sep='/'):
+        self.document = document
+        self.sep = sep
+
+        # path to value and to its keys
+        self._values = {}
+        self._keys = {}
+
+        # key name to the ordered paths ending in it
+        self._names = {}
+
+        self._index('', (), document, False)
+
+    def __contains__(self, path):
+        return self._join(path) in self._values
+
+    def __getitem__(self, path):
+        return self._values[self._join(path)]
+
+    def __len__(self):
+        return len(self._values)
+
+    def get(self, path, default=None):
+        """
+        Retrieve the value in path or default if it's not indexed.
+        """
+        return self._values.get(self._join(path), default)
+
+    def key_paths(self, name):
+        """
+        Retrieve the paths ending in the dict key name, in indexing order.
+        """
+        return list(self._names.get(name, ()))
+
+    def find_paths(self, name):
+        """
+        Retrieve the paths containing the dict key name, each path ending in
+        it followed by the paths nested under it, in indexing order.
+        """
+        result = []
+        seen = set()
+
+        for key_path in self._names.get(name, ()):
+            if key_path in seen:
+                continue
+
+            for path, _, _, _ in self._iter_nodes(
+                    key_path, self._keys[key_path], self._values[key_path],
+                    True):
+                if path not in seen:
+                    seen.add(path)
+                    result.append(path)
+
+        return result
+
+    def iter_prefix(self, prefix=''):
+        """
+        Yield (path, value) of the values nested under the prefix path.
+        """
+        prefix = self._join(prefix)
+        value = self._values[prefix]
+
+        nodes = self._iter_nodes(prefix, self._keys[prefix], value, False)
+        next(nodes)
+
+        for path, _, value, _ in nodes:
+            yield path, value
+
+    def set(self, path, value):
+        """
+        Set the value in path, the parent path must be indexed and could be
+        a list with the path index as its length to append the value.
+        """
+        path, keys = self._resolve(path)
+
+        if not keys:
+            self.__init__(value, self.sep)
+            return
+
+        container = self._values[self._join(keys[:-1])]
+        key = keys[-1]
+
+        if path in self._values:
+            self._unindex(path)
+
+        if isinstance(container, list) and key == len(container):
+            container.append(value)
+        else:
+            container[key] = value
+
+        self._index(path, keys, value, isinstance(container, dict))
+
+    def delete(self, path):
+        """
+        Delete the value in path, reindexing the following items of lists.
+        """
+        path, keys = self._resolve(path)
+
+        if path not in self._values or not keys:
+            raise KeyError(path)
+
+        parent_keys = keys[:-1]
+        parent = self._join(parent_keys)
+        container = self._values[parent]
+
+        if isinstance(container, list):
+            self._unindex(parent)
+            del container[keys[-1]]
+            self._index(
+                parent, parent_keys, container, self._is_key(parent_keys))
+
+        else:
+            self._unindex(path)
+            del container[keys[-1]]
+
+    def _join(self, path):
+        """
+        Retrieve the path joining the names of a list or tuple path.
+        """
+        if isinstance(path, (list, tuple)):
+            return self.sep.join(map(str, path))
+
+        return path
+
+    def _resolve(self, path):
+        """
+        Retrieve the path and its keys, the last one as list index if its
+        parent is a list.
+        """
+        if isinstance(path, (list, tuple)):
+            return self._join(path), tuple(path)
+
+        if path in self._keys:
+            return path, self._keys[path]
+
+        parent, _, name = path.rpartition(self.sep)
+        parent_value = self._values[parent]
+
+        if isinstance(parent_value, list):
+            if not name.isdigit():
+                raise KeyError(path)
+            name = int(name)
+
+        return path, self._keys[parent] + (name,)
+
+    def _is_key(self, keys):
+        """
+        Check if the last of keys is a dict key.
+        """
+        return bool(keys) and isinstance(
+            self._values[self._join(keys[:-1])], dict)
+
+    def _index(self, path, keys, value, is_key):
+        """
+        Index the value in path and its nested values.
+        """
+        for path, keys, value, is_key in self._iter_nodes(
+                path, keys, value, is_key):
+            self._values[path] = value
+            self._keys[path] = keys
+
+            if is_key:
+                self._names.setdefault(
+                    keys[-1], collections.OrderedDict())[path] = None
+
+    def _unindex(self, path):
+        """
+        Remove the value in path and its nested values from the index.
+        """
+        keys = self._keys[path]
+
+        for path, keys, _, is_key in self._iter_nodes(
+                path, keys, self._values[path], self._is_key(keys)):
+            del self._values[path]
+            del self._keys[path]
+
+            if is_key:
+                paths = self._names[keys[-1]]
+                del paths[path]
+
+                if not paths:
+                    del self._names[keys[-1]]
+
+    def _iter_nodes(self, path, keys, value, is_key):
+        """
+        Walk value without recursion yielding (path, keys, value, is_key) of
+        it and its nested values in document order.
+        """
+        yield path, keys, value, is_key
+
+        # frames of (path, keys, (key, value) iterator, is_key)
+        stack = []
+        if isinstance(value, dict):
+            stack.append((path, keys, iter(value.items()), True))
+        elif isinstance(value, list):
+            stack.append((path, keys, enumerate(value), False))
+
+        while stack:
+            parent, parent_keys, items, is_key = stack[-1]
+
+            for key, value in items:
+                path = parent + self.sep + str(key) if parent_keys \
+                    else str(key)
+                keys = parent_keys + (key,)
+
+                yield path, keys, value, is_key
+
+                if isinstance(value, dict):
+                    stack.append((path, keys, iter(value.items()), True))
+                    break
+                elif isinstance(value, list):
+                    stack.append((path, keys, enumerate(value), False))
+                    break
+
+            else:
+                stack.pop()
 
 
 def clean_dictkeys(ddict, exclusions=None):
     """
     Exclude chars in dict keys and return a clean dictionary.
     """
-    exclusions = [] if exclusions is None else exclusions
-
     if not isinstance(ddict, dict):
         return {}
 
-    for key in list(ddict.keys()):
-        if [incl for incl in exclusions if incl in key]:
-            data = ddict.pop(key)
-            clean_key = exclude_chars(key, exclusions)
+    return _key_cleaner(tuple(exclusions or ())).clean(ddict)
 
-            if clean_key:
-                if clean_key in ddict:
-                    ddict[clean_key] = force_list(ddict[clean_key])
-                    add_element(ddict, clean_key, data)
-                else:
-                    ddict[clean_key] = data
 
-        # dict case
-        if isinstance(ddict.get(key), dict):
-            ddict[key] = clean_dictkeys(ddict[key], exclusions)
+# Max cleaned keys cached by a KeyCleaner
+KEY_CACHE_SIZE = 64 * 1024
+
+
+class KeyCleaner():
+    """
+    Compiled exclusions to remove from the keys of nested dicts, with a
+    translate table if they are single chars or a regex otherwise. Cleaned
+    keys are cached, as the same keys recur across records.
+    """
+
+    def __init__(self, exclusions):
+        self.exclusions = [exclusion for exclusion in exclusions if exclusion]
+        self._cache = {}
+        self._table = None
+        self._regex = None
 
-        # list case
-        elif isinstance(ddict.get(key), list):
-            for row in ddict[key]:
-                if isinstance(row, dict):
-                    row = clean_dictkeys(row, exclusions)
+        if all(len(exclusion) == 1 for exclusion in self.exclusions):
+            self._table = str.maketrans('', '', ''.join(self.exclusions))
+        else:
+            self._regex = re.compile('|'.join(
+                re.escape(exclusion) for exclusion in self.exclusions))
+
+    def clean_key(self, key):
+        """
+        Retrieve the key without the exclusions, keys that are not str are
+        not cleaned.
+        """
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+
+        clean_key = key
+        if isinstance(key, str) and self.exclusions:
+            if self._table is not None:
+                clean_key = key.translate(self._table)
+            else:
+                clean_key = self._regex.sub('', key)
+
+        if len(self._cache) >= KEY_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[key] = clean_key
+
+        return clean_key
+
+    def clean(self, ddict):
+        """
+        Clean the keys of the nested dicts in ddict, in the dicts and lists
+        nested in it, without recursion. Values of keys that are empty once
+        cleaned are dropped and values of keys cleaned into an existing one
+        are added to it as a list.
+        """
+        if not self.exclusions:
+            return ddict
+
+        clean_key, cache = self.clean_key, self._cache
+        stack = [ddict]
+        seen = set()
+
+        while stack:
+            container = stack.pop()
+
+            if id(container) in seen:
+                continue
+            seen.add(id(container))
+
+            if isinstance(container, dict):
+                renames = []
+                for key in container:
+                    new_key = cache[key] if key in cache else clean_key(key)
+                    if new_key != key:
+                        renames.append((key, new_key))
+
+                for key, new_key in renames:
+                    data = container.pop(key)
+
+                    if not new_key:
+                        continue
+
+                    if new_key in container:
+                        # same list as force_list of the current value
+                        values = container[new_key]
+                        if values is None:
+                            values = []
+                        elif isinstance(values, collections.abc.Iterator):
+                            values = list(values)
+                        elif not isinstance(values, list):
+                            values = [values]
+                        values.append(data)
+                        container[new_key] = values
+                    else:
+                        container[new_key] = data
+
+                values = container.values()
+
+            else:
+                values = container
 
-    return ddict
+            for value in values:
+                if type(value) not in SIMPLE_TYPES and \
+                        isinstance(value, (dict, list)):
+                    stack.append(value)
+
+        return ddict
+
+
+@lru_cache(maxsize=32)
+def _key_cleaner(exclusions):
+    """
+    Retrieve the KeyCleaner of the exclusions tuple, cached with its keys.
+    """
+    return KeyCleaner(exclusions)
@@ -3,14 +3,31 @@
 Scrapbag csv file.
 """
 import io
+import os
+import re
 import csv
 import codecs
+import zipfile
+import posixpath
+import operator
 import itertools
 import collections
+import collections.abc
+import concurrent.futures
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from functools import lru_cache
 import xlrd
+import xlrd.biffh
 import structlog
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
+
+from .cache import cached_parse
 from .strings import normalizer
 from .collections import (exclude_empty_values, remove_list_duplicates,
                           force_list)
@@ -20,6 +37,31 @@ logger = structlog.getLogger(__name__)
 ARRAY_RAW_FORMAT = 0
 ARRAY_CLEAN_FORMAT = 1
 DICT_FORMAT = 2
+COLUMNAR_FORMAT = 3
+RECORD_FORMAT = 4
+
+# Xlsx xml parsing
+XLSX_WHITESPACE = '\t\n\r '
+XLSX_SPACE_ATTR = '{http://www.w3.org/XML/1998/namespace}space'
+XLSX_ESCAPE_REGEX = re.compile(r'_x([0-9A-Fa-f]{4})_')
+XLSX_CELL_REGEX = re.compile(r'\$?([A-Za-z]*)\$?([0-9]*)')
+XLSX_ERROR_CODES = {
+    text: code for code, text in xlrd.biffh.error_text_from_code.items()}
+
+# Csv types inference, number formats as (decimal, thousands) separators
+NUMBER_FORMATS = [('.', ','), (',', '.')]
+DATE_FORMATS = ['%Y-%m-%d', '%d/%m/%Y', '%Y/%m/%d', '%d-%m-%Y',
+                '%Y-%m-%d %H:%M:%S', '%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M']
+EMPTY_VALUES = ('', None)
+
+# Cell values excluded by exclude_empty_values in the column cleaner
+EMPTY_CELLS = ('', 'None', None, [], {})
+
+# Size in bytes of the csv ranges parsed by each process
+CSV_RANGE_SIZE = 4 * 1024 * 1024
+
+XlsxSheet = collections.namedtuple(
+    'XlsxSheet', ['nrows', 'ncols', 'merged_cells'])
 
 
 def get_csv_col_headers(rows, row_headers_count_value=0):
@@ -118,6 +160,213 @@ def retrieve_csv_data(rows, row_header=0, column_header=0, limit_column=0):
     return [row[row_header:limit_column] for row in rows[column_header:]]
 
 
+def infer_csv_types(csv_data, **kwargs):
+    """
+    Convert the csv data columns to the int, float, date or categorical
+    type inferred over a sample of their values, empty values as None.
+    Columns failing outside the sample are inferred again over all their
+    values.
+    Args:
+        :number_format: (decimal, thousands) separators, detected if None.
+        :date_formats: strptime formats tried to detect date columns.
+        :categorical_ratio: max ratio of distinct values of categoricals.
+        :sample_size: number of rows used to infer the types.
+    """
+    if not csv_data:
+        return csv_data
+
+    if kwargs.get('number_format') is None:
+        kwargs['number_format'] = csv_number_format(
+            csv_data[:kwargs.get('sample_size', 1000)])
+
+    column_types = csv_column_types(csv_data, **kwargs)
+
+    # rows of different length are converted one by one
+    if any(len(row) != len(column_types) for row in csv_data):
+        return [convert_csv_row(row, column_types) for row in csv_data]
+
+    columns = []
+    for values, (_, converter) in zip(zip(*csv_data), column_types):
+        try:
+            columns.append([converter(value) for value in values])
+        except (ValueError, TypeError):
+            _, converter = csv_column_type(values, **kwargs)
+            columns.append([converter(value) for value in values])
+
+    return [list(row) for row in zip(*columns)]
+
+
+def csv_column_types(csv_data, **kwargs):
+    """
+    Retrieve the (type_name, converter) of each csv data column inferred
+    over the first sample_size rows.
+    """
+    sample = csv_data[:kwargs.get('sample_size', 1000)]
+    width = max([len(row) for row in sample] or [0])
+
+    return [
+        csv_column_type(
+            [row[col_idx] for row in sample if col_idx < len(row)], **kwargs)
+        for col_idx in range(width)]
+
+
+def csv_column_type(values, number_format=None, date_formats=None,
+                    categorical_ratio=0.5, **kwargs):
+    """
+    Infer the type of a column values, returning (type_name, converter).
+    Type names are int, float, date, categorical or str, the converters of
+    every type give None for empty values.
+    """
+    decimal, thousands = number_format or NUMBER_FORMATS[0]
+    date_formats = DATE_FORMATS if date_formats is None else date_formats
+    values = [value for value in values if value not in EMPTY_VALUES]
+
+    if not values:
+        return 'str', _csv_converter(_csv_identity)
+
+    number_regex = csv_number_regex(decimal, thousands)
+    numbers = [_csv_number_match(value, number_regex) for value in values]
+
+    if all(numbers):
+        to_number = _csv_number_parser(decimal, thousands)
+        if all(number == 'int' for number in numbers):
+            return 'int', _csv_converter(lambda x: to_number(x, int))
+        return 'float', _csv_converter(lambda x: to_number(x, float))
+
+    if all(isinstance(value, str) for value in values):
+        for date_format in date_formats:
+            if _csv_all_dates(values, date_format):
+                return 'date', _csv_converter(
+                    lambda x: datetime.strptime(x.strip(), date_format))
+
+        if len(set(values)) <= len(values) * categorical_ratio:
+            categories = {}
+            return 'categorical', _csv_converter(
+                lambda x: categories.setdefault(x, x))
+
+    return 'str', _csv_converter(_csv_identity)
+
+
+def csv_number_format(csv_data, number_formats=None):
+    """
+    Detect the (decimal, thousands) separators parsing the most csv values
+    as numbers, the first number format wins on ties.
+    """
+    number_formats = number_formats or NUMBER_FORMATS
+    values = [value for row in csv_data for value in row
+              if isinstance(value, str) and value]
+
+    scores = [
+        sum(1 for value in values
+            if _csv_number_match(value, csv_number_regex(*number_format)))
+        for number_format in number_formats]
+
+    return number_formats[scores.index(max(scores))]
+
+
+@lru_cache(maxsize=32)
+def csv_number_regex(decimal, thousands):
+    """
+    Compile the regex matching numbers with the decimal and thousands
+    separators, grouping the decimal part. Integers with leading zeros are
+    codes, not numbers.
+    """
+    integer = r'0|[1-9]\d*'
+    if thousands:
+        integer = r'[1-9]\d{{0,2}}(?:{0}\d{{3}})+|0|[1-9]\d*'.format(
+            re.escape(thousands))
+
+    return re.compile(r'\s*[+-]?(?:{0})({1}\d+)?\s*$'.format(
+        integer, re.escape(decimal)))
+
+
+def convert_csv_row(row, column_types):
+    """
+    Convert the row values with the columns converters, keeping the values
+    failing the conversion.
+    """
+    result = list(row)
+
+    for col_idx, (value, (_, converter)) in enumerate(zip(row, column_types)):
+        try:
+            result[col_idx] = converter(value)
+        except (ValueError, TypeError):
+            pass
+
+    return result
+
+
+def _csv_number_match(value, number_regex):
+    """
+    Retrieve int or float if value is a number, otherwise None.
+    """
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        return None
+
+    if not isinstance(value, str):
+        return 'int' if float(value).is_integer() else 'float'
+
+    match = number_regex.match(value)
+    if match is None:
+        return None
+
+    return 'float' if match.group(1) else 'int'
+
+
+def _csv_number_parser(decimal, thousands):
+    """
+    Build the parser of numbers with the decimal and thousands separators.
+    """
+    number_regex = csv_number_regex(decimal, thousands)
+    table = str.maketrans({thousands: None, decimal: '.'}) \
+        if thousands else str.maketrans({decimal: '.'})
+
+    def to_number(value, number_type):
+        """
+        Parse value to number_type, values already parsed are casted.
+        """
+        if isinstance(value, str):
+            # thousands separators are only dropped in valid positions
+            if thousands and thousands in value and \
+                    not number_regex.match(value):
+                raise ValueError('{} is not a number'.format(value))
+            return number_type(value.translate(table))
+
+        if number_type is int and not float(value).is_integer():
+            raise ValueError('{} is not an integer'.format(value))
+
+        return number_type(value)
+
+    return to_number
+
+
+def _csv_all_dates(values, date_format):
+    """
+    Check all the values are dates in date_format.
+    """
+    try:
+        for value in values:
+            datetime.strptime(value.strip(), date_format)
+    except ValueError:
+        return False
+
+    return True
+
+
+def _csv_converter(parse):
+    """
+    Build a converter parsing the values, empty values as None.
+    """
+    return lambda value: None if value in EMPTY_VALUES else parse(value)
+
+
+def _csv_identity(value):
+    """
+    Keep the value as it is.
+    """
+    return value
+
+
 def csv_tolist(path_to_file, **kwargs):
     """
     Parse the csv file to a list of rows.
@@ -148,51 +397,562 @@ def csv_tolist(path_to_file, **kwargs):
     return result
 
 
+def csv_toiter(path_to_file, **kwargs):
+    """
+    Parse the csv file lazily, yielding one row at a time.
+    """
+    encoding = kwargs.get('encoding', 'utf-8')
+    delimiter = kwargs.get('delimiter', ',')
+    dialect = kwargs.get('dialect', csv.excel)
+
+    try:
+
+        with io.open(path_to_file, 'r', encoding=encoding, newline='') \
+                as items_file:
+            for row in csv.reader(
+                    items_file, delimiter=delimiter, dialect=dialect):
+                yield row
+
+    except Exception as ex:
+        logger.error('Fail parsing csv to iter of rows - {}'.format(ex))
+
+
+def csv_tolist_parallel(path_to_file, **kwargs):
+    """
+    Parse the csv file to a list of rows in a pool of worker processes.
+    """
+    result = []
+
+    try:
+        result = list(iter_csv_parallel(path_to_file, **kwargs))
+
+    except Exception as ex:
+        result = []
+        logger.error(
+            'Fail parsing csv to list of rows in parallel - {}'.format(ex))
+
+    return result
+
+
+def iter_csv_parallel(path_to_file, **kwargs):
+    """
+    Parse the csv file in a pool of worker processes, yielding the rows in
+    file order. The file is split in newline aligned byte ranges parsed
+    independently, so the csv must be well formed and its encoding ascii
+    compatible.
+    Args:
+        :workers: number of processes, by default the number of cpus.
+        :range_size: size in bytes of the ranges parsed by each process.
+    """
+    workers = kwargs.get('workers') or os.cpu_count() or 1
+    range_size = kwargs.get('range_size', CSV_RANGE_SIZE)
+    reader_kwargs = {
+        'encoding': kwargs.get('encoding', 'utf-8'),
+        'delimiter': kwargs.get('delimiter', ','),
+        'dialect': kwargs.get('dialect', csv.excel)}
+
+    # small files are not worth the pool
+    file_size = os.path.getsize(path_to_file)
+    if workers < 2 or file_size <= range_size:
+        yield from csv_range_tolist(
+            path_to_file, 0, file_size, **reader_kwargs)
+        return
+
+    quotechar = csv.reader(
+        [], delimiter=reader_kwargs['delimiter'],
+        dialect=reader_kwargs['dialect']).dialect.quotechar
+
+    ranges = csv_byte_ranges(
+        path_to_file, range_size,
+        quotechar.encode(reader_kwargs['encoding']) if quotechar else None)
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) \
+            as executor:
+
+        pending = collections.deque()
+        try:
+            for begin, end in ranges:
+                pending.append(executor.submit(
+                    csv_range_tolist, path_to_file, begin, end,
+                    **reader_kwargs))
+
+                # keep a bounded amount of parsed ranges waiting
+                if len(pending) >= workers * 2:
+                    yield from pending.popleft().result()
+
+            while pending:
+                yield from pending.popleft().result()
+
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def csv_byte_ranges(path_to_file, range_size, quotechar=b'"'):
+    """
+    Split the csv file in (begin, end) byte ranges of at least range_size
+    bytes, ending after a newline that is not inside a quoted value.
+    """
+    begin = offset = 0
+    quotes = 0
+
+    with io.open(path_to_file, 'rb') as csv_file:
+        for block in iter(lambda: csv_file.read(range_size), b''):
+            counted = 0
+            search = max(begin + range_size - offset, 0)
+
+            while search < len(block):
+                newline = block.find(b'\n', search)
+                if newline == -1:
+                    break
+
+                if quotechar:
+                    quotes += block.count(quotechar, counted, newline)
+                counted = newline
+
+                # an even number of quotes means the newline is unquoted
+                if quotes % 2 == 0:
+                    yield begin, offset + newline + 1
+                    begin = offset + newline + 1
+                    search = max(begin + range_size - offset, newline + 1)
+                else:
+                    search = newline + 1
+
+            if quotechar:
+                quotes += block.count(quotechar, counted)
+            offset += len(block)
+
+    if begin < offset:
+        yield begin, offset
+
+
+def csv_range_tolist(path_to_file, begin, end, **kwargs):
+    """
+    Parse the byte range [begin, end) of the csv file to a list of rows.
+    """
+    encoding = kwargs.get('encoding', 'utf-8')
+    delimiter = kwargs.get('delimiter', ',')
+    dialect = kwargs.get('dialect', csv.excel)
+
+    with io.open(path_to_file, 'rb') as csv_file:
+        csv_file.seek(begin)
+        data = csv_file.read(end - begin).decode(encoding)
+
+    return list(csv.reader(
+        io.StringIO(data, newline=None), delimiter=delimiter,
+        dialect=dialect))
+
+
 def excel_todictlist(path_to_file, **kwargs):
     """
     Parse excel file to a dict list of sheets, rows.
+    Args:
+        :sheets: names of the sheets to parse, the others are skipped.
+        :backend: name of the backend in EXCEL_BACKENDS used to parse the
+            excel, by default xlrd.
+    """
+    return collections.OrderedDict(
+        (sheet_name, list(rows))
+        for sheet_name, rows in iter_excel(path_to_file, **kwargs))
+
+
+def iter_excel(path_to_file, **kwargs):
+    """
+    Parse excel file lazily with the backend in EXCEL_BACKENDS selected by
+    the backend kwarg, by default xlrd, yielding (sheet_name, rows) pairs.
+    The rows of each sheet must be consumed before moving to the next one.
+    """
+    iter_sheets = EXCEL_BACKENDS[kwargs.get('backend', 'xlrd')]
+
+    return iter_sheets(path_to_file, **kwargs)
+
+
+def iter_excel_sheets(path_to_file, sheets=None, **kwargs):
+    """
+    Parse excel file lazily, yielding (sheet_name, rows) pairs. Sheets are
+    loaded on demand one at a time and unloaded once consumed.
+    Args:
+        :path_to_file: path to excel file.
+        :sheets: names of the sheets to parse, the others are skipped.
     """
-    result = collections.OrderedDict()
     encoding = kwargs.get('encoding', 'utf-8')
     formatting_info = '.xlsx' not in path_to_file
-    count = 0
 
     with xlrd.open_workbook(
         path_to_file,
-        encoding_override=encoding, formatting_info=formatting_info) \
-            as _excelfile:
+        encoding_override=encoding, formatting_info=formatting_info,
+        on_demand=True) as _excelfile:
+
+        for count, sheet_name_raw in enumerate(_excelfile.sheet_names()):
+
+            # if empty sheet name put sheet# as name
+            sheet_name = sheet_name_raw or "sheet{}".format(count)
+
+            if sheets is not None and sheet_name not in sheets:
+                continue
+
+            xl_sheet = _excelfile.sheet_by_index(count)
+
+            yield sheet_name, excel_sheet_tolist(xl_sheet)
+
+            # release sheet once consumed
+            _excelfile.unload_sheet(count)
+
+
+def excel_sheet_tolist(xl_sheet):
+    """
+    Parse excel sheet to a list of rows, filling merged cells values.
+    """
+    result = []
+
+    # merged ranges by cell and their values, resolved only once
+    merged_index = merged_cells_index(xl_sheet)
+    merged_values = {}
+
+    for row_idx in range(0, xl_sheet.nrows):
+        col_data = []
+        for col_idx in range(0, xl_sheet.ncols):
+
+            # Get cell object by row, col
+            cell_obj = xl_sheet.cell(row_idx, col_idx)
+            merged_range = merged_index.get((row_idx, col_idx))
+
+            # Search for value in merged_range
+            if not cell_obj.value and merged_range:
+                if merged_range not in merged_values:
+                    cell_obj = search_mergedcell_value(xl_sheet, merged_range)
+                    merged_values[merged_range] = \
+                        cell_obj.value if cell_obj else ''
+                col_data.append(merged_values[merged_range])
+            else:
+                col_data.append(cell_obj.value)
+
+        result.append(col_data)
+
+    return result
+
+
+def xlsx_todictlist(path_to_file, **kwargs):
+    """
+    Parse xlsx file to a dict list of sheets, rows, streaming the sheets xml.
+    """
+    return excel_todictlist(path_to_file, **dict(kwargs, backend='xlsx'))
+
+
+def iter_xlsx_sheets(path_to_file, sheets=None, **kwargs):
+    """
+    Parse xlsx file lazily without xlrd, yielding (sheet_name, rows) pairs
+    where rows is an iterator over the sheet rows. The sheets xml is parsed
+    incrementally so memory keeps bounded, the rows of each sheet must be
+    consumed before moving to the next one.
+    Args:
+        :path_to_file: path to xlsx file.
+        :sheets: names of the sheets to parse, the others are skipped.
+    """
+    with zipfile.ZipFile(path_to_file) as xlsx_file:
+
+        # zip names are case insensitive in xlsx files
+        names = {name.lower(): name for name in xlsx_file.namelist()}
+        shared_strings = xlsx_shared_strings(xlsx_file, names)
 
-        for sheet_name_raw in _excelfile.sheet_names():
+        sheet_paths = xlsx_sheet_paths(xlsx_file, names)
+        for count, (sheet_name_raw, sheet_path) in enumerate(sheet_paths):
 
             # if empty sheet name put sheet# as name
             sheet_name = sheet_name_raw or "sheet{}".format(count)
-            result[sheet_name] = []
 
-            xl_sheet = _excelfile.sheet_by_name(sheet_name_raw)
+            if sheets is not None and sheet_name not in sheets:
+                continue
+
+            yield sheet_name, iter_xlsx_sheet_rows(
+                xlsx_file, sheet_path, shared_strings)
 
-            for row_idx in range(0, xl_sheet.nrows):
-                col_data = []
-                for col_idx in range(0, xl_sheet.ncols):
 
-                    # Get cell object by row, col
-                    cell_obj = xl_sheet.cell(row_idx, col_idx)
-                    merged_info = is_merged(xl_sheet, row_idx, col_idx)
+def xlsx_sheet_paths(xlsx_file, names):
+    """
+    Retrieve the (sheet_name, xml path) of the worksheets in xlsx file.
+    """
+    result = []
+
+    rels = ET.parse(xlsx_file.open(names['xl/_rels/workbook.xml.rels']))
+    targets = {
+        rel.get('Id'): rel.get('Target') for rel in rels.iter()
+        if _xml_tag(rel) == 'Relationship' and
+        rel.get('Type', '').endswith('/worksheet')}
 
-                    # Search for value in merged_info
-                    if not cell_obj.value and merged_info:
-                        cell_obj = search_mergedcell_value(
-                            xl_sheet, merged_info[1])
-                        col_data.append(cell_obj.value if cell_obj else '')
-                    else:
-                        col_data.append(cell_obj.value)
+    workbook = ET.parse(xlsx_file.open(names['xl/workbook.xml']))
+    for sheet in workbook.iter():
+        if _xml_tag(sheet) != 'sheet':
+            continue
 
-                result[sheet_name].append(col_data)
+        rel_id = [v for k, v in sheet.attrib.items() if k.endswith('}id')]
+        target = targets.get(rel_id[0]) if rel_id else None
 
-            count += 1  # increase sheet counter
+        if target:
+            path = target[1:] if target.startswith('/') else \
+                posixpath.normpath(posixpath.join('xl', target))
+            result.append((sheet.get('name'), names[path.lower()]))
 
     return result
 
 
+def xlsx_shared_strings(xlsx_file, names):
+    """
+    Retrieve the shared strings table of xlsx file.
+    """
+    result = []
+
+    if 'xl/sharedstrings.xml' in names:
+        with xlsx_file.open(names['xl/sharedstrings.xml']) as xml_file:
+            for _, elem in ET.iterparse(xml_file):
+                if _xml_tag(elem) == 'si':
+                    result.append(_xlsx_rich_text(elem))
+                    elem.clear()
+
+    return result
+
+
+def iter_xlsx_sheet_rows(xlsx_file, sheet_path, shared_strings):
+    """
+    Parse xlsx sheet xml to rows like excel_sheet_tolist does.
+    The xml is read twice, first to retrieve the sheet dimensions and merged
+    cells that are placed after the data, then to yield the rows. Rows
+    with merged cells are only held until the merged cells value is read.
+    """
+    merged_cells = []
+    nrows = ncols = 0
+
+    with xlsx_file.open(sheet_path) as xml_file:
+        for row_idx, cells in _iter_xlsx_xml_rows(
+                xml_file, shared_strings, merged_cells):
+            if cells:
+                nrows = row_idx + 1
+                ncols = max([ncols] + [col_idx + 1 for col_idx, _ in cells])
+
+    # merged cells extend the sheet dimensions like in xlrd
+    for cell_range in merged_cells:
+        nrows = max(nrows, cell_range[1])
+        ncols = max(ncols, cell_range[3])
+
+    merged_rows = collections.defaultdict(list)
+    for (row_idx, col_idx), cell_range in merged_cells_index(
+            XlsxSheet(nrows, ncols, merged_cells)).items():
+        merged_rows[row_idx].append((col_idx, cell_range))
+
+    merged_values = {}
+    pending_rows = collections.deque()
+
+    def add_row(row_idx, cells):
+        """
+        Build the row list and take the merged cells values found in it.
+        """
+        col_data = [''] * ncols
+        for col_idx, value in cells:
+            col_data[col_idx] = value
+
+        for col_idx, cell_range in merged_rows.get(row_idx, []):
+            if col_data[col_idx] and cell_range not in merged_values:
+                merged_values[cell_range] = col_data[col_idx]
+
+        pending_rows.append((row_idx, col_data))
+
+    def flush_rows(last_row_idx):
+        """
+        Yield the pending rows whose merged cells values are known once the
+        rows until last_row_idx have been read.
+        """
+        while pending_rows:
+            row_idx, col_data = pending_rows[0]
+            merged_info = merged_rows.get(row_idx, [])
+
+            if any(not col_data[col_idx] and
+                   cell_range not in merged_values and
+                   cell_range[1] - 1 > last_row_idx
+                   for col_idx, cell_range in merged_info):
+                break
+
+            for col_idx, cell_range in merged_info:
+                if not col_data[col_idx]:
+                    col_data[col_idx] = merged_values.get(cell_range, '')
+
+            pending_rows.popleft()
+            yield col_data
+
+    next_row_idx = 0
+    with xlsx_file.open(sheet_path) as xml_file:
+        for row_idx, cells in _iter_xlsx_xml_rows(xml_file, shared_strings):
+            if row_idx >= nrows:
+                break
+
+            # rows missing in xml are empty rows
+            for empty_row_idx in range(next_row_idx, row_idx):
+                add_row(empty_row_idx, [])
+
+            add_row(row_idx, cells)
+            next_row_idx = max(next_row_idx, row_idx + 1)
+
+            yield from flush_rows(row_idx)
+
+    for empty_row_idx in range(next_row_idx, nrows):
+        add_row(empty_row_idx, [])
+
+    yield from flush_rows(nrows)
+
+
+def _iter_xlsx_xml_rows(xml_file, shared_strings, merged_cells=None):
+    """
+    Parse xlsx sheet xml yielding (row_idx, [(col_idx, value), ..]) with the
+    cells with value, appending the merged cells ranges found to
+    merged_cells.
+    """
+    row_idx = -1
+    sheet_data = None
+
+    for event, elem in ET.iterparse(xml_file, events=('start', 'end')):
+        if event == 'start':
+            if sheet_data is None and _xml_tag(elem) == 'sheetData':
+                sheet_data = elem
+            continue
+
+        tag = _xml_tag(elem)
+
+        if tag == 'row':
+            row_idx = int(elem.get('r')) - 1 if elem.get('r') else row_idx + 1
+            col_idx = -1
+            cells = []
+
+            for cell in elem:
+                col_idx = _xlsx_cell_index(cell.get('r'))[1] \
+                    if cell.get('r') else col_idx + 1
+                has_value, value = _xlsx_cell_value(cell, shared_strings)
+                if has_value:
+                    cells.append((col_idx, value))
+
+            yield row_idx, cells
+
+            # release parsed rows
+            elem.clear()
+            if sheet_data is not None:
+                sheet_data.clear()
+
+        elif tag == 'mergeCell' and merged_cells is not None:
+            refs = elem.get('ref', '').split(':')
+            if refs[0]:
+                first_row, first_col = _xlsx_cell_index(refs[0])
+                last_row, last_col = _xlsx_cell_index(refs[-1])
+                merged_cells.append(
+                    (first_row, last_row + 1, first_col, last_col + 1))
+
+
+def _xlsx_cell_value(cell, shared_strings):
+    """
+    Retrieve (has_value, value) of a xlsx cell, converting the values like
+    xlrd does.
+    """
+    cell_type = cell.get('t', 'n')
+    text = None
+
+    for child in cell:
+        child_tag = _xml_tag(child)
+        if child_tag == 'v':
+            text = _xlsx_text(child) if cell_type == 'str' else child.text
+        elif child_tag == 'is':
+            text = _xlsx_rich_text(child)
+
+    if cell_type == 'n':
+        return bool(text), float(text) if text else ''
+
+    elif cell_type == 's':
+        return bool(text), shared_strings[int(text)] if text else ''
+
+    elif cell_type == 'str':
+        return True, text
+
+    elif cell_type == 'b':
+        return True, 1 if text in ('1', 'true', 'on') else 0
+
+    elif cell_type == 'e':
+        return True, XLSX_ERROR_CODES.get(text or '#N/A')
+
+    return bool(text), text or ''
+
+
+def _xlsx_cell_index(cell_name):
+    """
+    Retrieve (row_idx, col_idx) from a cell name like B3.
+    """
+    match = XLSX_CELL_REGEX.match(cell_name)
+    row_idx = int(match.group(2)) - 1 if match.group(2) else None
+
+    return row_idx, _xlsx_column_index(match.group(1).upper())
+
+
+@lru_cache(maxsize=1024)
+def _xlsx_column_index(column_name):
+    """
+    Retrieve col_idx from a column name like AB.
+    """
+    col_idx = 0
+    for char in column_name:
+        col_idx = col_idx * 26 + ord(char) - ord('A') + 1
+
+    return col_idx - 1
+
+
+def _xlsx_text(elem):
+    """
+    Retrieve the unescaped text of a xlsx xml element.
+    """
+    text = elem.text
+    if text is None:
+        return ''
+
+    if elem.get(XLSX_SPACE_ATTR) != 'preserve':
+        text = text.strip(XLSX_WHITESPACE)
+
+    return XLSX_ESCAPE_REGEX.sub(
+        lambda match: chr(int(match.group(1), 16)), text)
+
+
+def _xlsx_rich_text(elem):
+    """
+    Retrieve the text of a xlsx shared string or inline string element.
+    """
+    result = []
+
+    for child in elem:
+        if _xml_tag(child) == 't':
+            result.append(_xlsx_text(child))
+        elif _xml_tag(child) == 'r':
+            result.extend(
+                _xlsx_text(t_elem) for t_elem in child
+                if _xml_tag(t_elem) == 't')
+
+    return ''.join(result)
+
+
+def _xml_tag(elem):
+    """
+    Retrieve xml element tag without namespace.
+    """
+    return _xml_local_name(elem.tag)
+
+
+@lru_cache(maxsize=128)
+def _xml_local_name(tag):
+    """
+    Retrieve xml tag name without namespace.
+    """
+    return tag.rsplit('}', 1)[-1]
+
+
+# Excel parsers by backend name, yielding (sheet_name, rows) pairs
+EXCEL_BACKENDS = {
+    'xlrd': iter_excel_sheets,
+    'xlsx': iter_xlsx_sheets,
+}
+
+
 def search_mergedcell_value(xl_sheet, merged_range):
     """
     Search for a value in merged_range cells.
@@ -221,6 +981,29 @@ def is_merged(sheet, row, column):
     return False
 
 
+def merged_cells_index(sheet):
+    """
+    Map each (row, column) cell inside the sheet merged cells to its merged
+    range, applying the same checks than is_merged, so every cell lookup is
+    done in constant time.
+    """
+    result = {}
+
+    for cell_range in sheet.merged_cells:
+        row_low, row_high, column_low, column_high = cell_range
+
+        # mirrors the range filter in is_merged
+        if ((column_high - column_low) < sheet.ncols - 1) and \
+                ((row_high - row_low) < sheet.nrows - 1):
+
+            for row in range(row_low, row_high):
+                for column in range(column_low, column_high):
+                    # first range found wins, like in is_merged
+                    result.setdefault((row, column), tuple(cell_range))
+
+    return result
+
+
 def populate_headers(headers):
     """
     Concatenate headers with subheaders
@@ -261,6 +1044,62 @@ def row_csv_limiter(rows, limits=None):
     return rows[upper_limit: lower_limit]
 
 
+def iter_row_csv_limiter(rows, limits=None, sample_size=1000, tail_size=100):
+    """
+    Streaming version of row_csv_limiter. The upper limit is detected over
+    the first sample_size rows and the lower limit over the last tail_size
+    rows, so only those rows are held in memory.
+    """
+    limits = [None, None] if limits is None else limits
+    num_limits = len(exclude_empty_values(limits))
+    lower_limit = limits[1] if num_limits == 2 else None
+
+    rows = iter(rows)
+    head = list(itertools.islice(rows, sample_size))
+
+    if num_limits:
+        upper_limit = limits[0]
+    else:
+        upper_limit = row_iter_limiter(head, 0, 1, 0)
+
+    rows = itertools.chain(head, rows)
+
+    # upper limits counted from the end only keep the last rows
+    if upper_limit is not None and upper_limit < 0:
+        tail = collections.deque(maxlen=-upper_limit)
+        count = 0
+        for count, row in enumerate(rows, 1):
+            tail.append(row)
+
+        tail = list(tail)
+        if lower_limit is not None and lower_limit >= 0:
+            # lower limit counted from the first of all the rows
+            lower_limit = max(lower_limit - (count - len(tail)), 0)
+
+        yield from tail[:lower_limit]
+        return
+
+    # limits counted from the beginning can be applied while streaming
+    if lower_limit is not None and lower_limit >= 0:
+        yield from itertools.islice(rows, upper_limit, lower_limit)
+        return
+
+    # hold back the tail rows until the end of rows is reached
+    delay = tail_size if lower_limit is None else -lower_limit
+    tail = collections.deque()
+
+    for row in itertools.islice(rows, upper_limit, None):
+        tail.append(row)
+        if len(tail) > delay:
+            yield tail.popleft()
+
+    tail = list(tail)
+    if lower_limit is None:
+        lower_limit = row_iter_limiter(tail, 1, -1, 1)
+
+    yield from tail[:lower_limit]
+
+
 def row_iter_limiter(rows, begin_row, way, c_value):
     """
     Alghoritm to detect row limits when row have more that one column.
@@ -287,7 +1126,15 @@ def csv_row_cleaner(rows):
 
 
     """
-    result = []
+    return list(iter_csv_row_cleaner(rows))
+
+
+def iter_csv_row_cleaner(rows):
+    """
+    Streaming version of csv_row_cleaner, yield the rows that pass the
+    checks.
+    """
+    last_row = None
 
     for row in rows:
 
@@ -296,36 +1143,73 @@ def csv_row_cleaner(rows):
 
         # check more or eq than 1 unique element in row
         check_set = len(set(exclude_empty_values(row))) > 1
-        # check row not into result cleaned rows.
-        check_last_allready = (result and result[-1] == row)
+
+        # check row not the last cleaned row.
+        check_last_allready = last_row == row
 
         if check_empty and check_set and not check_last_allready:
-            result.append(row)
-    return result
+            last_row = row
+            yield row
 
 
-def csv_column_cleaner(rows):
+def csv_column_indexes(rows, sample_size=None):
     """
-    clean csv columns parsed omitting empty/dirty rows.
+    Retrieve the indexes of the csv columns with enough non empty values to
+    be kept by the column cleaner, counted in one pass over the rows or
+    over the first sample_size rows.
     """
+    if sample_size:
+        rows = rows[:sample_size]
 
-    # check columns if there was empty columns
-    result = [[] for x in range(0, len(rows))]
-    for i_index in range(0, len(rows[0])):
+    width = len(rows[0])
+    counts = [0] * width
 
-        partial_values = []
+    for row in rows:
+        for i_index, value in enumerate(row[:width]):
+            if value not in EMPTY_CELLS:
+                counts[i_index] += 1
 
-        for x_row in rows:
-            partial_values.append(
-                x_row[i_index] if len(x_row) > i_index else '')
+    # adjust this value
+    return [i_index for i_index, count in enumerate(counts)
+            if count > len(rows) / 5]
 
-        colum_rows = exclude_empty_values(partial_values)
 
-        if len(colum_rows) > len(rows) / 5:  # adjust this value
-            for index in range(0, len(rows)):
-                result[index].append(
-                    rows[index][i_index] if len(rows[index]) > i_index else '')
-    return result
+def select_csv_columns(row, indexes):
+    """
+    Take the row values in indexes, filling missing values with ''.
+    """
+    return [row[i_index] if len(row) > i_index else '' for i_index in indexes]
+
+
+def iter_select_csv_columns(rows, indexes):
+    """
+    Take the rows values in indexes, filling missing values with ''.
+    """
+    if len(indexes) < 2:
+        for row in rows:
+            yield select_csv_columns(row, indexes)
+        return
+
+    # rows long enough are projected at once
+    getter = operator.itemgetter(*indexes)
+    width = max(indexes) + 1
+
+    for row in rows:
+        yield list(getter(row)) if len(row) >= width \
+            else select_csv_columns(row, indexes)
+
+
+def csv_column_cleaner(rows, sample_size=None):
+    """
+    clean csv columns parsed omitting empty/dirty rows.
+    Args:
+        :sample_size: number of first rows used to check the columns.
+    """
+
+    # check columns if there was empty columns
+    indexes = csv_column_indexes(rows, sample_size)
+
+    return list(iter_select_csv_columns(rows, indexes))
 
 
 def csv_column_header_cleaner(rows):
@@ -358,6 +1242,109 @@ def csv_dict_format(csv_data, c_headers=None, r_headers=None):
     return result
 
 
+def csv_record_format(csv_data, c_headers=None, r_headers=None):
+    """
+    Format csv rows parsed to compact records, read only mappings of the
+    column headers like the Dict format rows, see csv_record_type.
+    """
+    record_type = csv_record_type(c_headers)
+
+    # format dict if has row_headers
+    if r_headers:
+        result = {}
+        for k_index in range(0, len(csv_data)):
+            if r_headers[k_index]:
+                result[r_headers[k_index]] = record_type(csv_data[k_index])
+
+    # format list if hasn't row_headers -- square csv
+    else:
+        result = [list(map(record_type, csv_data))]
+
+    return result
+
+
+class CsvRecord(collections.abc.Mapping):
+    """
+    Read only mapping of the column headers to the values of a csv row,
+    holding only the row values. Subclasses are built by csv_record_type
+    with the headers of each table. Records are not dicts, so they don't
+    support item assignment or json.dumps, _asdict() converts them.
+    """
+    __slots__ = ('_values',)
+
+    _headers = ()
+    _keys = ()
+    _indexes = {}
+
+    def __new__(cls, values):
+        values = tuple(values)
+
+        # values without header are dropped and missing ones have no key,
+        # like zipping them
+        if len(values) < len(cls._headers):
+            cls = csv_record_type(cls._headers[:len(values)])
+        elif len(values) > len(cls._headers):
+            values = values[:len(cls._headers)]
+
+        record = object.__new__(cls)
+        record._values = values
+
+        return record
+
+    def __getitem__(self, key):
+        return self._values[self._indexes[key]]
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._indexes
+
+    def __repr__(self):
+        return '{}({!r})'.format(
+            type(self).__name__, list(self.items()))
+
+    def __reduce__(self):
+        return _csv_record, (self._headers, self._values)
+
+    def _asdict(self):
+        """
+        Retrieve the record as an OrderedDict.
+        """
+        return collections.OrderedDict(self.items())
+
+
+@lru_cache(maxsize=128)
+def _csv_record_type(headers):
+    """
+    Build the CsvRecord subclass of the headers tuple.
+    """
+    indexes = {header: index for index, header in enumerate(headers)}
+
+    return type('CsvRecord', (CsvRecord,), {
+        '__slots__': (),
+        '_headers': headers,
+        '_keys': tuple(remove_list_duplicates(headers)),
+        '_indexes': indexes})
+
+
+def csv_record_type(c_headers):
+    """
+    Retrieve the CsvRecord type of the column headers, cached by headers.
+    """
+    return _csv_record_type(tuple(c_headers or ()))
+
+
+def _csv_record(headers, values):
+    """
+    Rebuild a pickled CsvRecord.
+    """
+    return csv_record_type(headers)(values)
+
+
 def csv_array_clean_format(csv_data, c_headers=None, r_headers=None):
     """
     Format csv rows parsed to Array clean format.
@@ -382,9 +1369,56 @@ def csv_array_clean_format(csv_data, c_headers=None, r_headers=None):
     return result
 
 
+def csv_columnar_format(csv_data, c_headers=None, r_headers=None,
+                        typed_columns=False):
+    """
+    Format csv rows parsed to columns, a dict with the row headers as index
+    and the values of each column header.
+    Args:
+        :typed_columns: turn numeric columns into numpy arrays if available.
+    """
+    c_headers = [] if c_headers is None else c_headers
+    r_headers = [] if r_headers is None else r_headers
+
+    columns = collections.OrderedDict(
+        (c_header, []) for c_header in c_headers)
+
+    # transpose the rows, the last column wins on repeated headers like in
+    # the dict format
+    for c_header, values in zip(c_headers, zip(*csv_data)):
+        columns[c_header] = csv_column_array(values) if typed_columns \
+            else list(values)
+
+    return {'index': list(r_headers), 'columns': columns}
+
+
+def csv_column_array(values):
+    """
+    Turn the column values into a numpy int or float array if they are all
+    numbers, empty values as nan, otherwise keep them as list.
+    """
+    if numpy is None or all(value in EMPTY_VALUES for value in values):
+        return list(values)
+
+    # floats are not tried as int as numpy would truncate them
+    if all(isinstance(value, (str, int)) for value in values):
+        try:
+            return numpy.array(values, dtype=numpy.int64)
+        except (ValueError, OverflowError):
+            pass
+
+    try:
+        return numpy.array(
+            [numpy.nan if value in EMPTY_VALUES else value
+             for value in values],
+            dtype=numpy.float64)
+    except (ValueError, TypeError):
+        return list(values)
+
+
 def csv_format(csv_data, c_headers=None, r_headers=None, rows=None, **kwargs):
     """
-    Format csv rows parsed to Dict or Array
+    Format csv rows parsed to Dict, Array, Columns or Records
     """
     result = None
     c_headers = [] if c_headers is None else c_headers
@@ -405,6 +1439,16 @@ def csv_format(csv_data, c_headers=None, r_headers=None, rows=None, **kwargs):
     elif result_format == ARRAY_CLEAN_FORMAT:
         result = csv_array_clean_format(csv_data, c_headers, r_headers)
 
+    # COLUMNAR_FORMAT
+    elif result_format == COLUMNAR_FORMAT:
+        result = csv_columnar_format(
+            csv_data, c_headers, r_headers,
+            kwargs.get('typed_columns', False))
+
+    # RECORD_FORMAT
+    elif result_format == RECORD_FORMAT:
+        result = csv_record_format(csv_data, c_headers, r_headers)
+
     else:
         result = None
 
@@ -415,12 +1459,20 @@ def csv_format(csv_data, c_headers=None, r_headers=None, rows=None, **kwargs):
     return result
 
 
+@cached_parse
 def csv_to_dict(csv_filepath, **kwargs):
     """
     Turn csv into dict.
     Args:
         :csv_filepath: path to csv file to turn into dict.
         :limits: path to csv file to turn into dict
+        :cache: ParseCache or cache dir path to reuse the parsed results.
+        :infer_types: convert the data columns to their inferred types, see
+            infer_csv_types.
+        :result_format: ARRAY_RAW_FORMAT, ARRAY_CLEAN_FORMAT, DICT_FORMAT,
+            COLUMNAR_FORMAT or RECORD_FORMAT. RECORD_FORMAT rows are read
+            only CsvRecord mappings, not dicts: item assignment and
+            json.dumps fail on them, use record._asdict() for a dict.
     """
     callbacks = {'to_list': csv_tolist,
                  'row_csv_limiter': row_csv_limiter,
@@ -431,7 +1483,8 @@ def csv_to_dict(csv_filepath, **kwargs):
                  'populate_headers': populate_headers,
                  'csv_column_header_cleaner': csv_column_header_cleaner,
                  'csv_column_cleaner': csv_column_cleaner,
-                 'retrieve_csv_data': retrieve_csv_data}
+                 'retrieve_csv_data': retrieve_csv_data,
+                 'infer_csv_types': infer_csv_types}
 
     callbacks.update(kwargs.get('alt_callbacks', {}))
     rows = kwargs.get('rows', [])
@@ -479,6 +1532,10 @@ def csv_to_dict(csv_filepath, **kwargs):
         row_header=num_row_headers,
         limit_column=len(c_headers) - len(c_headers_dirty) or None)
 
+    # convert columns to their inferred types
+    if kwargs.get('infer_types'):
+        csv_data = callbacks.get('infer_csv_types')(csv_data, **kwargs)
+
     # Check column headers validation
     if csv_data:
         assert len(c_headers) == len(csv_data[0])
@@ -494,28 +1551,239 @@ def csv_to_dict(csv_filepath, **kwargs):
     return result
 
 
-def excel_to_dict(excel_filepath, encapsulate_filepath=False, **kwargs):
+def iter_csv_to_dict(csv_filepath, **kwargs):
+    """
+    Turn csv into a stream of dict rows.
+    Limits and headers are detected over a bounded sample of the first and
+    last rows, so memory keeps constant whatever the size of the csv.
+    Args:
+        :csv_filepath: path to csv file to turn into dict.
+        :limits: upper and lower rows limits.
+        :sample_size: number of first rows used to detect the headers.
+        :tail_size: number of last rows used to detect the lower limit.
+        :infer_types: convert the values to the types inferred over the
+            sample, see infer_csv_types.
+        :result_format: DICT_FORMAT, the default, or RECORD_FORMAT to yield
+            read only CsvRecord rows instead of OrderedDict, see csv_to_dict.
+            Other formats raise ValueError.
+    Yields OrderedDict rows, or (row_header, OrderedDict) pairs if the csv
+    has row headers.
+    """
+    result_format = kwargs.get('result_format', DICT_FORMAT)
+    if result_format not in (DICT_FORMAT, RECORD_FORMAT):
+        msg = 'Unsupported result format {} streaming {}'.format(
+            result_format, csv_filepath)
+        logger.error(msg)
+        raise ValueError(msg)
+
+    callbacks = {'to_iter': csv_toiter,
+                 'iter_row_csv_limiter': iter_row_csv_limiter,
+                 'iter_csv_row_cleaner': iter_csv_row_cleaner,
+                 'csv_column_indexes': csv_column_indexes,
+                 'row_headers_count': row_headers_count,
+                 'get_col_header': get_csv_col_headers,
+                 'populate_headers': populate_headers,
+                 'csv_column_header_cleaner': csv_column_header_cleaner,
+                 'csv_column_types': csv_column_types}
+
+    callbacks.update(kwargs.get('alt_callbacks', {}))
+    sample_size = kwargs.get('sample_size', 1000)
+    rows = kwargs.get('rows')
+
+    if rows is None:
+        # csv_toiter of rows
+        rows = callbacks.get('to_iter')(csv_filepath, **kwargs)
+
+    # apply limits
+    rows = callbacks.get('iter_row_csv_limiter')(
+        rows,
+        kwargs.get('limits', [None, None]),
+        sample_size=sample_size,
+        tail_size=kwargs.get('tail_size', 100))
+
+    # apply row cleaner
+    rows = callbacks.get('iter_csv_row_cleaner')(rows)
+
+    # take the sample used to detect the headers
+    sample = list(itertools.islice(rows, sample_size))
+
+    if not sample:
+        msg = 'Empty rows obtained from {}'.format(csv_filepath)
+        logger.warning(msg)
+        raise ValueError(msg)
+
+    # apply column cleaner
+    indexes = callbacks.get('csv_column_indexes')(sample)
+    sample = list(iter_select_csv_columns(sample, indexes))
+
+    # count raw headers
+    num_row_headers = callbacks.get('row_headers_count')(sample)
+
+    # take colum_headers
+    c_headers_raw = callbacks.get('get_col_header')(sample, num_row_headers)
+
+    # format colum_headers
+    c_headers_dirty = callbacks.get('populate_headers')(
+        c_headers_raw) if len(c_headers_raw) > 1 else c_headers_raw[0]
+
+    # Clean csv column headers of empty values.
+    c_headers = callbacks.get('csv_column_header_cleaner')(c_headers_dirty)
+    limit_column = len(c_headers) - len(c_headers_dirty) or None
+
+    # last values found for each row header, to populate the empty ones
+    r_header_values = {}
+
+    # column types inferred over the sample data
+    column_types = None
+    if kwargs.get('infer_types'):
+        sample_data = retrieve_csv_data(
+            sample, num_row_headers, len(c_headers_raw), limit_column)
+
+        if kwargs.get('number_format') is None:
+            kwargs['number_format'] = csv_number_format(sample_data)
+        column_types = callbacks.get('csv_column_types')(
+            sample_data, **kwargs)
+
+    # compact records instead of OrderedDict rows
+    record_type = None
+    if result_format == RECORD_FORMAT:
+        record_type = csv_record_type(c_headers)
+
+    data_rows = itertools.chain(
+        sample[len(c_headers_raw):],
+        iter_select_csv_columns(rows, indexes))
+
+    for row in data_rows:
+        values = row[num_row_headers:limit_column]
+        if column_types:
+            values = convert_csv_row(values, column_types)
+
+        if record_type is not None:
+            record = record_type(values)
+        else:
+            record = collections.OrderedDict(zip(c_headers, values))
+
+        if not num_row_headers:
+            yield record
+            continue
+
+        # populate row headers extending the upper ones
+        r_header = remove_list_duplicates(force_list(row[:num_row_headers]))
+        for k_index, value in enumerate(r_header):
+            if value:
+                r_header_values[k_index] = value
+            elif k_index in r_header_values:
+                r_header[k_index] = r_header_values[k_index]
+
+        r_header = " ".join(map(str, r_header))
+        if r_header:
+            yield r_header, record
+
+
+def excel_sheet_to_dict(excel_filepath, rows, **kwargs):
+    """
+    Turn the rows of an excel sheet into dict like csv_to_dict. The rows
+    streamed by the xlsx backend are turned with iter_csv_to_dict in the
+    Dict and Record formats, so the sheet rows are never held in memory,
+    only the result. Other rows are turned with csv_to_dict.
+    """
+    result_format = kwargs.get('result_format')
+
+    if isinstance(rows, list) or \
+            result_format not in (DICT_FORMAT, RECORD_FORMAT):
+        return csv_to_dict(excel_filepath, **dict(kwargs, rows=list(rows)))
+
+    # same result as csv_dict_format and csv_record_format
+    records = []
+    r_header_records = {}
+
+    for item in iter_csv_to_dict(excel_filepath, **dict(kwargs, rows=rows)):
+        if isinstance(item, tuple):
+            r_header, record = item
+            r_header_records[r_header] = record
+        else:
+            records.append(item)
+
+    return r_header_records or [records]
+
+
+def excel_sheets_to_dict(excel_filepath, excel_data, workers, **kwargs):
+    """
+    Turn excel sheets rows into dict in a pool of worker processes, keeping
+    the sheets order. excel_data is a dict or an iterable of (sheet, rows)
+    pairs, read one sheet at a time. Only the rows of each sheet are sent
+    to the workers and held until they are parsed.
+    """
+    result = {}
+
+    if isinstance(excel_data, dict):
+        excel_data = excel_data.items()
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) \
+            as executor:
+
+        futures = [
+            (sheet, executor.submit(
+                csv_to_dict, excel_filepath, **dict(kwargs, rows=list(rows))))
+            for sheet, rows in excel_data]
+
+        for sheet, future in futures:
+            try:
+                result[sheet] = future.result()
+            except Exception as ex:
+                logger.error('Fail to parse sheet {} - {}'.format(sheet, ex))
+                result[sheet] = []
+
+    return result
+
+
+@cached_parse
+def excel_to_dict(excel_filepath, encapsulate_filepath=False, workers=None,
+                  **kwargs):
     """
     Turn excel into dict.
     Args:
         :excel_filepath: path to excel file to turn into dict.
         :limits: path to csv file to turn into dict
+        :cache: ParseCache or cache dir path to reuse the parsed results.
+        :sheets: names of the sheets to parse, the others are skipped.
+        :backend: name of the backend in EXCEL_BACKENDS used to parse the
+            excel, 'xlsx' streams the sheets of xlsx files.
+        :workers: number of processes to parse the sheets in parallel.
+    The sheets are read and turned into dict one at a time, so the rows of
+    each sheet are released before the next one is loaded. With the xlsx
+    backend and the Dict or Record formats the rows of each sheet are also
+    streamed, see excel_sheet_to_dict, so memory is bounded by the result
+    instead of the rows. Workers receive the whole rows of each sheet.
     """
     result = {}
     try:
-        callbacks = {'to_dictlist': excel_todictlist}  # Default callback
+        callbacks = {'to_iter': iter_excel}  # Default callback
         callbacks.update(kwargs.get('alt_callbacks', {}))
 
-        # Retrieve excel data as dict of sheets lists
-        excel_data = callbacks.get('to_dictlist')(excel_filepath, **kwargs)
-        for sheet in excel_data.keys():
-            try:
-                kwargs['rows'] = excel_data.get(sheet, [])
-                result[sheet] = csv_to_dict(excel_filepath, **kwargs)
-            except Exception as ex:
-                logger.error('Fail to parse sheet {} - {}'.format(sheet, ex))
-                result[sheet] = []
-                continue
+        # Retrieve excel data as (sheet, rows) pairs
+        if 'to_dictlist' in callbacks:
+            excel_data = callbacks.get('to_dictlist')(
+                excel_filepath, **kwargs).items()
+        else:
+            excel_data = callbacks.get('to_iter')(excel_filepath, **kwargs)
+
+        if workers and workers > 1:
+            result = excel_sheets_to_dict(
+                excel_filepath, excel_data, workers, **kwargs)
+
+        else:
+            for sheet, rows in excel_data:
+                try:
+                    result[sheet] = excel_sheet_to_dict(
+                        excel_filepath, rows, **kwargs)
+                except Exception as ex:
+                    logger.error(
+                        'Fail to parse sheet {} - {}'.format(sheet, ex))
+                    result[sheet] = []
+
+                # release the sheet rows before the next one is loaded
+                del rows
 
         if encapsulate_filepath:
             result = {excel_filepath: result}
@@ -13,6 +13,7 @@ import pdfminer.high_level
 
 import structlog
 
+from .cache import cached_parse
 from .collections import exclude_empty_values
 
 pdfminer.settings.STRICT = False
@@ -95,10 +96,13 @@ def pdf_row_cleaner(rows, **kwargs):
     return exclude_empty_values(rows)
 
 
+@cached_parse
 def pdf_to_dict(pdf_filepath, **kwargs):
 
     """
     Main method to parse a pdf file to a dict.
+    Args:
+        :cache: ParseCache or cache dir path to reuse the parsed results.
     """
 
     callbacks = {
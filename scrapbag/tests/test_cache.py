@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+Test Scrapbag cache file
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from scrapbag.cache import (
+    ParseCache,
+    cached_parse,
+    file_token,
+    stable_token
+    )
+from scrapbag.csvs import csv_tolist, csv_to_dict, excel_to_dict
+
+
+UTILS_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PARSED_FILES = []
+
+
+def counted_tolist(path_to_file, **kwargs):
+    """
+    csv_tolist callback recording the parsed files.
+    """
+    PARSED_FILES.append(path_to_file)
+    return csv_tolist(path_to_file, **kwargs)
+
+
+class UtilsCacheTestCase(unittest.TestCase):
+    """
+    Scrapbag cache Test Case
+    """
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.data_dir = tempfile.mkdtemp()
+        del PARSED_FILES[:]
+
+        self.csv_path = os.path.join(self.data_dir, 'test.csv')
+        with open(self.csv_path, 'w') as csv_file:
+            csv_file.write('a,b\n1,2\n3,4\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+        shutil.rmtree(self.data_dir)
+
+    def test_cached_parse(self):
+        """
+        Test cached_parse on csv_to_dict
+        """
+        callbacks = {'to_list': counted_tolist}
+        cache = ParseCache(self.cache_dir)
+
+        result = csv_to_dict(
+            self.csv_path, result_format=2, alt_callbacks=callbacks,
+            cache=cache)
+        result2 = csv_to_dict(
+            self.csv_path, result_format=2, alt_callbacks=callbacks,
+            cache=cache)
+
+        self.assertEqual(result, result2)
+        self.assertEqual(
+            result, csv_to_dict(self.csv_path, result_format=2))
+        self.assertEqual(len(PARSED_FILES), 1)
+
+        # other kwargs are other entries
+        csv_to_dict(
+            self.csv_path, result_format=1, alt_callbacks=callbacks,
+            cache=self.cache_dir)
+        self.assertEqual(len(PARSED_FILES), 2)
+
+        # content changes are misses
+        with open(self.csv_path, 'w') as csv_file:
+            csv_file.write('a,b\n5,6\n')
+
+        result3 = csv_to_dict(
+            self.csv_path, result_format=2, alt_callbacks=callbacks,
+            cache=cache)
+        self.assertEqual(len(PARSED_FILES), 3)
+        self.assertEqual(result3, [[{'a': '5', 'b': '6'}]])
+
+        # invalidate by file
+        self.assertEqual(cache.invalidate(self.csv_path), 3)
+        csv_to_dict(
+            self.csv_path, result_format=2, alt_callbacks=callbacks,
+            cache=cache)
+        self.assertEqual(len(PARSED_FILES), 4)
+
+    def test_cached_parse_excel(self):
+        """
+        Test cached_parse on excel_to_dict
+        """
+        path = os.path.join(UTILS_PATH, 'tests/files/xlsx/xlsx_test1.xlsx')
+
+        result = excel_to_dict(path, result_format=2, cache=self.cache_dir)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+        self.assertEqual(
+            excel_to_dict(path, result_format=2, cache=self.cache_dir),
+            result)
+        self.assertEqual(excel_to_dict(path, result_format=2), result)
+
+    def test_cached_parse_not_cached(self):
+        """
+        Test cached_parse skipping empty results and read rows
+        """
+        calls = []
+
+        @cached_parse
+        def parse(filepath, **kwargs):
+            calls.append(filepath)
+            return kwargs.get('result')
+
+        parse(self.csv_path, result=[], cache=self.cache_dir)
+        parse(self.csv_path, result=[], cache=self.cache_dir)
+        parse(self.csv_path, rows=[[1]], result=[1], cache=self.cache_dir)
+        parse(self.csv_path, rows=[[1]], result=[1], cache=self.cache_dir)
+        parse('not/found/file.csv', result=[1], cache=self.cache_dir)
+
+        self.assertEqual(len(calls), 5)
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    def test_cached_parse_closures(self):
+        """
+        Test cached_parse skipping callables without a stable identity
+        """
+        def make(value):
+            def to_list(path_to_file, **kwargs):
+                return [['a', 'b'], [value, '1']]
+            return to_list
+
+        for value in ['X', 'Y']:
+            self.assertEqual(
+                csv_to_dict(
+                    self.csv_path, alt_callbacks={'to_list': make(value)},
+                    cache=self.cache_dir),
+                [[['a', 'b'], [value, '1']]])
+
+        self.assertEqual(os.listdir(self.cache_dir), [])
+        self.assertRaises(ValueError, stable_token, make('X'))
+        self.assertRaises(ValueError, stable_token, lambda x: x)
+
+    def test_evict(self):
+        """
+        Test ParseCache evict
+        """
+        cache = ParseCache(self.cache_dir, max_size=0)
+        cache.set('a-1', list(range(100)))
+        self.assertEqual(cache.get('a-1'), (False, None))
+
+        cache.max_size = 1024 * 1024
+        for key in ['a-1', 'a-2', 'b-1']:
+            cache.set(key, list(range(100)))
+            os.utime(
+                os.path.join(self.cache_dir, key + '.pkz'),
+                (len(os.listdir(self.cache_dir)),) * 2)
+
+        # a-1 becomes the most recently used
+        self.assertEqual(cache.get('a-1'), (True, list(range(100))))
+
+        cache.max_size = sum(
+            os.path.getsize(os.path.join(self.cache_dir, name))
+            for name in os.listdir(self.cache_dir)) - 1
+        cache.evict()
+
+        self.assertEqual(
+            sorted(os.listdir(self.cache_dir)), ['a-1.pkz', 'b-1.pkz'])
+
+        cache.clear()
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    def test_tracked_size(self):
+        """
+        Test ParseCache evicting only when its tracked size exceeds max_size
+        """
+        cache = ParseCache(self.cache_dir, max_size=1024 * 1024)
+
+        with mock.patch.object(cache, 'evict', wraps=cache.evict) as evict:
+            for key in ['a-1', 'a-2', 'a-1']:
+                cache.set(key, list(range(100)))
+            self.assertEqual(evict.call_count, 1)
+
+            size = sum(
+                os.path.getsize(os.path.join(self.cache_dir, name))
+                for name in os.listdir(self.cache_dir))
+            self.assertEqual(cache._size, size)
+
+            cache.max_size = size + 1
+            cache.set('b-1', list(range(100)))
+            self.assertEqual(evict.call_count, 2)
+            self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+    @mock.patch('scrapbag.cache.os.utime')
+    def test_get_touch_error(self, mock_utime):
+        """
+        Test ParseCache get returning the read value if touching fails
+        """
+        mock_utime.side_effect = PermissionError('read only')
+        cache = ParseCache(self.cache_dir)
+        cache.set('a-1', [1])
+
+        self.assertEqual(cache.get('a-1'), (True, [1]))
+
+    def test_file_token(self):
+        """
+        Test file_token
+        """
+        token = file_token(self.csv_path)
+        self.assertTrue(token.startswith('sha1:'))
+        self.assertTrue(file_token(self.csv_path, True).startswith('stat:'))
+
+        os.utime(self.csv_path, (0, 0))
+        self.assertEqual(file_token(self.csv_path), token)
+
+    def test_stable_token(self):
+        """
+        Test stable_token
+        """
+        self.assertEqual(
+            stable_token({'b': 1, 'a': [csv_tolist, (1, '2')]}),
+            stable_token({'a': [csv_tolist, (1, '2')], 'b': 1}))
+        self.assertEqual(
+            stable_token(csv_tolist), 'scrapbag.csvs.csv_tolist')
+        self.assertNotEqual(stable_token([1]), stable_token((1,)))
+        self.assertEqual(stable_token({3, 1, 2}), stable_token({1, 2, 3}))
+        self.assertNotEqual(
+            stable_token(ParseCache(self.cache_dir).key),
+            stable_token(ParseCache(self.data_dir).key))
+
@@ -2,28 +2,49 @@
 """
 Test Scrapbag collection file
 """
+import pickle
 import unittest
 from collections import OrderedDict
+
+from structlog.testing import capture_logs
+
 from scrapbag.collections import (
 
+    Exclusion,
     exclude_values,
     exclude_empty_values,
     check_fields,
     chunks,
+    chunked,
+    parallel_map_chunks,
     get_element,
     add_element,
+    NestedBuilder,
+    unflatten,
+    compile_path,
+    CompiledPath,
     find_value_in_object,
+    find_values_in_object,
     force_list,
     simplify_collection,
     flatten,
+    iter_flatten,
     merge_dicts,
+    deep_merge,
     nested_dict_to_list,
+    iter_nested_rows,
     remove_list_duplicates,
+    iter_unique,
     dict2orderedlist,
+    project_records,
     get_dimension,
     get_ldict_keys,
+    SchemaAccumulator,
     get_alldictkeys,
+    iter_dictkeys,
+    PathIndex,
     clean_dictkeys,
+    KeyCleaner,
     )
 
 
@@ -72,6 +93,47 @@ class UtilsCollectionsTestCase(unittest.TestCase):
         self.assertEqual(len(filtered.get('f', {})), 2)
         self.assertEqual(len(filtered2.get('f', {})), 1)
 
+        # inplace keeps the containers
+        nested = OrderedDict([
+            ('a', ['', [None, []], 'x', {'b': '', 'c': 0.0}]),
+            ('d', 'None')])
+        nested_a = nested['a']
+        result = exclude_empty_values(nested, inplace=True)
+
+        self.assertIs(result, nested)
+        self.assertIs(result['a'], nested_a)
+        self.assertEqual(result, {'a': ['x', {'c': 0.0}]})
+        self.assertEqual(exclude_empty_values('None', inplace=True), 'None')
+
+    def test_exclusion(self):
+        """
+        Test Exclusion
+        """
+        exclusion = Exclusion([0, '', [1], {}])
+
+        self.assertEqual(exclusion.hashable, {0, ''})
+        self.assertEqual(exclusion.unhashable, [[1], {}])
+        self.assertIn(False, exclusion)
+        self.assertIn(0.0, exclusion)
+        self.assertIn([1], exclusion)
+        self.assertIn(OrderedDict(), exclusion)
+        self.assertNotIn('0', exclusion)
+        self.assertNotIn((1,), exclusion)
+        self.assertNotIn({1}, exclusion)
+
+        self.assertEqual(
+            exclusion.exclude([[2, 0], [1, 0], [[1]], {'a': {'b': 0}}, ()]),
+            [[2], [], ()])
+        self.assertEqual(
+            exclude_values(exclusion, {'a': 1, 'b': [0]}), {'a': 1, 'b': []})
+
+        # deep nesting does not recurse
+        deep = current = []
+        for _ in range(5000):
+            current.extend(['', []])
+            current = current[1]
+        self.assertEqual(exclude_empty_values(deep), [])
+
     def test_check_fields(self):
         """
         Test check_fields
@@ -192,6 +254,39 @@ class UtilsCollectionsTestCase(unittest.TestCase):
             add_element(result, 'a.aa', {'aab': 3}),
             {'a': {'aa': {'aaa': 2, 'aab': 3}, 'ab': 3}})
 
+    def test_unflatten(self):
+        """
+        Test unflatten and NestedBuilder
+        """
+        test = {
+            'a': [{'aa': 1, 'ab': [1, 2]}, {'aa': 2}],
+            'b': {'ba': 'x', 'bb': {'bba': 3}}}
+
+        self.assertEqual(unflatten(flatten(test)), test)
+        self.assertEqual(
+            unflatten(list(flatten(test, sep='/').items()), sep='/'), test)
+        self.assertEqual(
+            unflatten({'a_0': 1, 'a_1': 2}, digit=False),
+            {'a': {'0': 1, '1': 2}})
+
+        # same results as add_element in order
+        pairs = [
+            ('a/b/0', 1), ('a/b/0', 2), ('a/b/2', 3), ('a/c', 4), ('a', 5),
+            ('a/c/d', 6), ('x/1/y', 7), ('x/1/y', 8), ('x/1', 9)]
+
+        for kwargs in [{}, {'override': True}, {'digit': False}]:
+            expected = {}
+            for path, value in pairs:
+                add_element(expected, path, value, **kwargs)
+
+            builder = NestedBuilder(**kwargs)
+            self.assertEqual(builder.update(pairs), expected)
+
+        builder = NestedBuilder({'a': [1]})
+        builder.add(compile_path('a/1'), 2)
+        builder.add('b..c', 3)
+        self.assertEqual(builder.source, {'a': [1, 2], 'b': {'c': 3}})
+
     def test_find_value_in_nested_dict(self):
         """
         Test find_value_in_nested_dict
@@ -201,6 +296,65 @@ class UtilsCollectionsTestCase(unittest.TestCase):
         self.assertEqual(
             list(find_value_in_object('c', self.obj)), ['c1', 'c2', 'c3'])
 
+    def test_find_values_in_object(self):
+        """
+        Test find_values_in_object
+        """
+        self.assertEqual(
+            find_values_in_object(['g', 'c', 'f2', 'x'], self.obj),
+            {'g': ['g1', 'ff3'], 'c': ['c1', 'c2', 'c3'], 'f2': ['ff2'],
+             'x': []})
+        self.assertEqual(
+            find_values_in_object('g', self.obj), {'g': ['g1', 'ff3']})
+
+        self.assertEqual(
+            find_values_in_object({'g', 'f2'}, self.obj, max_depth=1),
+            {'g': ['g1'], 'f2': []})
+        self.assertEqual(
+            find_values_in_object(['g', 'c'], self.obj, max_matches=2),
+            {'g': ['g1', 'ff3'], 'c': ['c1', 'c2']})
+        self.assertEqual(
+            find_values_in_object(
+                ['g', 'c'], [self.obj, self.obj], max_matches=1),
+            {'g': ['g1'], 'c': ['c1']})
+
+        # deep nesting does not recurse
+        deep = {'x': 1}
+        for _ in range(5000):
+            deep = {'a': [deep]}
+        self.assertEqual(find_values_in_object(['x'], deep), {'x': [1]})
+        self.assertEqual(
+            find_values_in_object(['x'], deep, max_depth=100), {'x': []})
+
+    def test_compile_path(self):
+        """
+        Test compile_path
+        """
+        path = compile_path('a/b.0//None')
+
+        self.assertTrue(isinstance(path, CompiledPath))
+        self.assertIs(compile_path('a/b.0//None'), path)
+        self.assertIs(compile_path(path), path)
+        self.assertIsNot(compile_path('a/b.0//None', r'/'), path)
+
+        self.assertEqual(path.names, ('a', 'b', '0', '', 'None'))
+        self.assertEqual(path.indexes, (None, None, 0, None, None))
+        self.assertEqual(path.add_names, ('a', 'b', '0'))
+
+        # empty names stop the get
+        source = {'a': {'b': [{'c': 1}, 2]}}
+        self.assertEqual(path.get(source), {'c': 1})
+        self.assertEqual(get_element(source, path), {'c': 1})
+        self.assertEqual(compile_path('a.c').get(source), None)
+
+        result = path.set({}, 1)
+        self.assertEqual(result, {'a': {'b': [1]}})
+        self.assertEqual(path.set(result, 2), {'a': {'b': [1, 2]}})
+        self.assertEqual(
+            add_element({}, compile_path('a.1'), 1, digit=False),
+            {'a': {'1': 1}})
+        self.assertEqual(path.set(None, 1), False)
+
     def test_force_list(self):
         """
         Test force_list
@@ -238,12 +392,68 @@ class UtilsCollectionsTestCase(unittest.TestCase):
 
         self.assertEqual(simplify_collection(test5), [1, 2, 3])
 
+        self.assertEqual(
+            simplify_collection(iter([{'a': [''], 'b': ['x']}])), {'b': 'x'})
+        self.assertEqual(simplify_collection({'a': ''}), {})
+        self.assertEqual(simplify_collection('x'), 'x')
+
+        # deep nesting does not recurse
+        deep = 1
+        for _ in range(5000):
+            deep = {'a': [deep, '']}
+
+        result = simplify_collection(deep)
+        for _ in range(5000):
+            result = result['a']
+        self.assertEqual(result, 1)
+
     def test_chunks(self):
 
         self.assertEqual(len([x for x in chunks([1, 2, 3, 4, 5], 2)]), 3)
         self.assertEqual(len([x for x in chunks([1, 2, 3, 4, 5], 100)]), 1)
         self.assertEqual([x for x in chunks({'test': 2}, 4)], [])
 
+    def test_chunked(self):
+        """
+        Test chunked
+        """
+        result = chunked((x for x in range(5)), 2)
+
+        self.assertEqual(next(result), [0, 1])
+        self.assertEqual(list(result), [[2, 3], [4]])
+        self.assertEqual(list(chunked([], 2)), [])
+        self.assertRaises(ValueError, list, chunked([1], 0))
+
+    def test_parallel_map_chunks(self):
+        """
+        Test parallel_map_chunks
+        """
+        consumed = []
+
+        def numbers():
+            for number in range(100):
+                consumed.append(number)
+                yield number
+
+        expected = [sum(range(x, min(x + 3, 100))) for x in range(0, 100, 3)]
+
+        self.assertEqual(
+            list(parallel_map_chunks(sum, range(100), 3, workers=4)),
+            expected)
+        self.assertEqual(
+            sorted(parallel_map_chunks(
+                sum, range(100), 3, workers=4, ordered=False)),
+            sorted(expected))
+        self.assertEqual(
+            list(parallel_map_chunks(sum, range(100), 3, workers=1)),
+            expected)
+
+        # bounded chunks in flight
+        results = parallel_map_chunks(sum, numbers(), 3, workers=2)
+        self.assertEqual(next(results), 3)
+        self.assertLessEqual(len(consumed), 2 * 2 * 3)
+        results.close()
+
     def test_flatten(self):
         """
         Test flatten
@@ -361,6 +571,32 @@ class UtilsCollectionsTestCase(unittest.TestCase):
 
         self.assertEqual(flatten('test'), 'test')
 
+    def test_iter_flatten(self):
+        """
+        Test iter_flatten
+        """
+        test = {'a': [{'b': 1}, {}, 2], 'c': {'d': []}, 'e': 3}
+        result = iter_flatten(test, sep='/')
+
+        self.assertFalse(isinstance(result, (dict, list)))
+        self.assertEqual(
+            sorted(result), [('a/0/b', 1), ('a/2', 2), ('e', 3)])
+        self.assertEqual(
+            OrderedDict(iter_flatten(test, 'p')), flatten(test, 'p'))
+        self.assertEqual(list(iter_flatten('test')), [])
+
+        # deep nesting does not recurse, logging once without the data
+        deep = 1
+        for _ in range(5000):
+            deep = {'a': deep}
+        with capture_logs() as logs:
+            self.assertEqual(
+                list(iter_flatten(deep, sep='.')),
+                [('.'.join(['a'] * 5000), 1)])
+        self.assertEqual(
+            logs, [{'event': 'Flattening', 'type': 'dict', 'size': 1,
+                    'log_level': 'debug'}])
+
     def test_merge_dicts(self):
 
         self.assertEqual(merge_dicts({}, {'a': 1}), {'a': 1})
@@ -383,6 +619,44 @@ class UtilsCollectionsTestCase(unittest.TestCase):
         self.assertEqual(merge_dicts([], []), {})
         self.assertEqual(merge_dicts({'a': 1}, []), {})
 
+        # merged into base and keys are not split
+        base = {'a': {'a.b': 1}}
+        self.assertIs(merge_dicts(base, {'a': {'a.b': 2, 'c/d': 3}}), base)
+        self.assertEqual(base, {'a': {'a.b': 2, 'c/d': 3}})
+
+    def test_deep_merge(self):
+        """
+        Test deep_merge lists strategies
+        """
+        base = {'a': {'aa': [1, {'x': 1}], 'ab': 1}, 'b': [1]}
+        merge = {'a': {'aa': [2, {'y': 2}, 3], 'ac': 2}, 'b': 5}
+
+        self.assertEqual(
+            deep_merge(base, merge, lists='append'),
+            {'a': {'aa': [1, {'x': 1}, 2, {'y': 2}, 3], 'ab': 1, 'ac': 2},
+             'b': 5})
+        self.assertEqual(
+            deep_merge(base, merge, lists='replace'),
+            {'a': {'aa': [2, {'y': 2}, 3], 'ab': 1, 'ac': 2}, 'b': 5})
+        self.assertEqual(
+            deep_merge(base, merge, lists='index'),
+            {'a': {'aa': [2, {'x': 1, 'y': 2}, 3], 'ab': 1, 'ac': 2},
+             'b': 5})
+        self.assertEqual(
+            deep_merge(base, merge, lists=lambda x, y: x + y[:1]),
+            {'a': {'aa': [1, {'x': 1}, 2], 'ab': 1, 'ac': 2}, 'b': 5})
+        self.assertEqual(
+            deep_merge(base, merge),
+            merge_dicts({'a': {'aa': [1, {'x': 1}], 'ab': 1}, 'b': [1]},
+                        merge))
+
+        # base is copied unless inplace
+        self.assertEqual(base, {'a': {'aa': [1, {'x': 1}], 'ab': 1}, 'b': [1]})
+        self.assertIs(deep_merge(base, {'c': 1}, inplace=True), base)
+        self.assertEqual(base['c'], 1)
+
+        self.assertEqual(deep_merge(base, merge, lists='unknown'), {})
+
     def test_nested_dict_to_list(self):
         """
         Test nested_dict_to_list
@@ -419,6 +693,26 @@ class UtilsCollectionsTestCase(unittest.TestCase):
 
         self.assertEqual(len(result_exclusion), len(expected[:2]))
 
+    def test_iter_nested_rows(self):
+        """
+        Test iter_nested_rows
+        """
+        test = OrderedDict([
+            ('a', OrderedDict([('aa', 1), ('__self', 2)])),
+            ('b', 3)])
+
+        result = iter_nested_rows('', test)
+
+        self.assertEqual(next(result), ['a', 'aa', 1])
+        self.assertEqual(list(result), [['', 'b', 3]])
+
+        # deep nesting does not recurse
+        deep = {'x': 1}
+        for _ in range(5000):
+            deep = {'a': deep}
+        self.assertEqual(
+            next(iter_nested_rows('', deep)), ['a/' * 4999 + 'a', 'x', 1])
+
     def test_remove_duplicates(self):
         """
         Test remove_duplicates
@@ -434,6 +728,25 @@ class UtilsCollectionsTestCase(unittest.TestCase):
         self.assertEqual(result, expected)
         self.assertEqual(result1, expected1)
 
+        lista = [{'a': [1]}, (1, [2]), {1, 2}, 1, True, {'a': [1]},
+                 (1, [2]), frozenset([2, 1]), 'a', (1, 2), [1, 2]]
+
+        self.assertEqual(
+            remove_list_duplicates(lista),
+            [{'a': [1]}, (1, [2]), {1, 2}, 1, 'a', (1, 2), [1, 2]])
+        self.assertEqual(
+            remove_list_duplicates(lista, unique=True),
+            ['a', (1, 2), [1, 2]])
+
+    def test_iter_unique(self):
+        """
+        Test iter_unique
+        """
+        result = iter_unique(iter(['b', 'a', 'b', ['a'], 'c', ['a']]))
+
+        self.assertEqual(next(result), 'b')
+        self.assertEqual(list(result), ['a', ['a'], 'c'])
+
     def test_dict2orderedlist(self):
         """
         Test dict2orderedlist
@@ -453,6 +766,44 @@ class UtilsCollectionsTestCase(unittest.TestCase):
         self.assertEqual(result3, [3, 2, 1])
         self.assertEqual(result4, [3, 2, 1, 'test'])
 
+    def test_project_records(self):
+        """
+        Test project_records
+        """
+        records = [
+            {'a': 1, 'b': {'ba': [2, 3]}, 'c': None},
+            {'a': 4, 'b': 5},
+            None,
+            [{'a': 6}],
+        ]
+        paths = ['a', 'b.ba.1', 'c', 'x', '0']
+
+        result = project_records(records, paths, default='-')
+        self.assertFalse(isinstance(result, list))
+        self.assertEqual(
+            list(result),
+            [dict2orderedlist(record, paths, default='-')
+             for record in records])
+
+        # single name paths
+        self.assertEqual(
+            list(project_records(records, ['a', 'c'], default=None)),
+            [[1, None], [4, None], [None, None], [None, None]])
+        self.assertEqual(
+            list(project_records(records, ['a/b'], separator=r'\.')),
+            [[''], [''], [''], ['']])
+
+        # columns
+        self.assertEqual(
+            project_records(records[:2], ['a', 'b'], columnar=True),
+            [[1, 4], [{'ba': [2, 3]}, 5]])
+        self.assertEqual(
+            project_records(iter(records[:2]), ['a', 'x'], columnar=True),
+            [[1, 4], ['', '']])
+        self.assertEqual(project_records([], ['a'], columnar=True), [[]])
+        self.assertEqual(
+            project_records(iter([]), ['a'], columnar=True), [[]])
+
     def test_get_dimension(self):
         """
         Test get_dimension
@@ -497,6 +848,32 @@ class UtilsCollectionsTestCase(unittest.TestCase):
         self.assertEqual(all(x in result2b for x in assert_result2b), True)
         self.assertEqual(len(result2b), 4)
 
+    def test_schema_accumulator(self):
+        """
+        Test SchemaAccumulator
+        """
+        records = [
+            {'a': 1, 'b': {'c': 'x'}}, ['skip'], {'b': {'c': None}, 'd': 2}]
+
+        schema = SchemaAccumulator(flatten_keys=True, sep='/')
+        schema.update(iter(records * 1500))
+
+        self.assertEqual(schema.keys(), ['a', 'b/c', 'd'])
+        self.assertEqual(schema.records, 3000)
+        self.assertEqual(schema.counts, {'a': 1500, 'b/c': 3000, 'd': 1500})
+        self.assertEqual(
+            schema.types, {'a': {int}, 'b/c': {str, type(None)}, 'd': {int}})
+
+        # merge accumulators of other processes
+        first = SchemaAccumulator().update(records[1:])
+        second = pickle.loads(pickle.dumps(SchemaAccumulator()))
+        second.add(records[0])
+        first.merge(second)
+
+        self.assertEqual(first.keys(), ['b', 'd', 'a'])
+        self.assertEqual(first.counts, {'a': 1, 'b': 2, 'd': 1})
+        self.assertEqual(first.types['b'], {dict})
+
     def test_get_alldictkeys(self):
         """
         Test get_alldictkeys
@@ -513,6 +890,64 @@ class UtilsCollectionsTestCase(unittest.TestCase):
         self.assertEqual(len(result1), 4)
         self.assertEqual(result2, [()])
 
+    def test_iter_dictkeys(self):
+        """
+        Test iter_dictkeys
+        """
+        test = OrderedDict([('a', {'aa': {'aaa': 1}, 'ab': {}}), ('b', [2])])
+
+        result = iter_dictkeys(test, ['p'])
+
+        self.assertEqual(next(result), ('p', 'a', 'aa', 'aaa'))
+        self.assertEqual(list(result), [('p', 'b')])
+        self.assertEqual(list(iter_dictkeys(1)), [()])
+
+    def test_path_index(self):
+        """
+        Test PathIndex
+        """
+        document = {'a': {'b': [{'c': 1}, {'c': 2, 'd': 3}]}, 'c': 4}
+        index = PathIndex(document)
+
+        self.assertEqual(index['a/b/1/c'], get_element(document, 'a/b/1/c'))
+        self.assertEqual(index[('a', 'b', 0)], {'c': 1})
+        self.assertIn('a/b/1/d', index)
+        self.assertIsNone(index.get('a/x'))
+        self.assertEqual(len(index), 9)
+
+        self.assertEqual(index.key_paths('c'), ['a/b/0/c', 'a/b/1/c', 'c'])
+        self.assertEqual(index.find_paths('c'), ['a/b/0/c', 'a/b/1/c', 'c'])
+        self.assertEqual(
+            index.find_paths('b'), ['a/b', 'a/b/0', 'a/b/0/c', 'a/b/1',
+                                    'a/b/1/c', 'a/b/1/d'])
+        self.assertEqual(
+            list(index.iter_prefix('a/b/1')),
+            [('a/b/1/c', 2), ('a/b/1/d', 3)])
+
+        index.set('a/b/2', {'c': 5})
+        index.set('a/e', 6)
+        self.assertEqual(document['a']['b'][2], {'c': 5})
+        self.assertEqual(index['a/b/2/c'], 5)
+        self.assertEqual(index['a/e'], 6)
+
+        index.delete('a/b/0')
+        self.assertEqual(document['a']['b'], [{'c': 2, 'd': 3}, {'c': 5}])
+        self.assertEqual(index['a/b/1/c'], 5)
+        self.assertNotIn('a/b/2', index)
+        self.assertEqual(
+            sorted(index.key_paths('c')), ['a/b/0/c', 'a/b/1/c', 'c'])
+
+        index.delete('c')
+        self.assertEqual(index.key_paths('c'), ['a/b/0/c', 'a/b/1/c'])
+
+        # nested paths of keys inside other paths of the same key
+        index = PathIndex({'c': {'x': {'c': 1}}})
+        self.assertEqual(index.key_paths('c'), ['c', 'c/x/c'])
+        self.assertEqual(index.find_paths('c'), ['c', 'c/x', 'c/x/c'])
+
+        self.assertRaises(KeyError, index.delete, 'x')
+        self.assertRaises(KeyError, index.set, 'x/y', 1)
+
     def test_clean_dictkeys(self):
         """
         Test clean_dictkeys
@@ -567,3 +1002,27 @@ class UtilsCollectionsTestCase(unittest.TestCase):
             sorted(flatten(dict(result4)).keys()),
             sorted(flatten(assert_result4).keys())
         )
+
+    def test_key_cleaner(self):
+        """
+        Test KeyCleaner
+        """
+        cleaner = KeyCleaner(['.', '__'])
+        row = {'k.ey': 1}
+        test = {
+            'a.b': {'c__d': 1},
+            'ab': 2,
+            '__': 3,
+            1: [[row, row], {'e.': [4]}]}
+
+        self.assertEqual(cleaner.clean_key('x.y__z'), 'xyz')
+        self.assertEqual(cleaner.clean_key(1), 1)
+
+        self.assertIs(cleaner.clean(test), test)
+        self.assertEqual(
+            test,
+            {'ab': [2, {'cd': 1}], 1: [[{'key': 1}, {'key': 1}], {'e': [4]}]})
+
+        # single chars are translated
+        self.assertEqual(KeyCleaner('._').clean({'a._b': 1}), {'ab': 1})
+        self.assertEqual(KeyCleaner([]).clean({'a.b': 1}), {'a.b': 1})
@@ -3,22 +3,49 @@
 Test Scrapbag csv file
 """
 import os
+import pickle
+import tempfile
+import datetime
 import unittest
 import mock
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 from scrapbag.tests.files.mock_csv import MockSheet, MockCell
 from scrapbag.csvs import (
     get_csv_col_headers,
     row_headers_count,
     get_row_headers,
+    infer_csv_types,
+    csv_column_type,
+    csv_number_format,
     csv_tolist,
+    csv_toiter,
+    csv_tolist_parallel,
+    csv_byte_ranges,
     excel_todictlist,
+    iter_excel,
+    iter_excel_sheets,
+    xlsx_todictlist,
+    iter_xlsx_sheets,
     search_mergedcell_value,
+    is_merged,
+    merged_cells_index,
     row_csv_limiter,
     row_iter_limiter,
+    iter_row_csv_limiter,
+    csv_row_cleaner,
+    csv_column_cleaner,
     csv_format,
+    csv_columnar_format,
+    csv_column_array,
+    csv_record_type,
     csv_to_dict,
+    iter_csv_to_dict,
     excel_to_dict
     )
 
@@ -106,6 +133,81 @@ class UtilsCSVTestCase(unittest.TestCase):
         # TODO: Make test
         pass
 
+    def test_infer_csv_types(self):
+        """
+        Test infer_csv_types
+        """
+        test_data = [['1.234,5', '1', 'a', '01/02/2020', '08001'],
+                     ['2,5', '', 'a', '', '08002'],
+                     ['-3', '3', 'b', '03/02/2020', '08003'],
+                     ['4', '4', 'a', '04/02/2020', '08004']]
+
+        result = infer_csv_types(test_data)
+
+        self.assertEqual(
+            result[0],
+            [1234.5, 1, 'a', datetime.datetime(2020, 2, 1), '08001'])
+        self.assertEqual(result[1], [2.5, None, 'a', None, '08002'])
+        self.assertEqual(result[2][:2], [-3.0, 3])
+        self.assertTrue(isinstance(result[2][1], int))
+
+        # columns failing outside the sample are inferred again
+        result2 = infer_csv_types(
+            test_data + [['x', '5.5', 'c', '5', '6']], sample_size=4)
+        self.assertEqual(
+            [row[0] for row in result2], [row[0] for row in test_data] + ['x'])
+        self.assertEqual(
+            [row[1] for row in result2], ['1', None, '3', '4', '5.5'])
+
+        # rows of different length
+        self.assertEqual(
+            infer_csv_types([['1', 'a'], ['2']]), [[1, 'a'], [2]])
+        self.assertEqual(infer_csv_types([]), [])
+
+    def test_csv_column_type(self):
+        """
+        Test csv_column_type
+        """
+        self.assertEqual(csv_column_type(['1', '2', ''])[0], 'int')
+        self.assertEqual(csv_column_type(['1', '2.5'])[0], 'float')
+        self.assertEqual(csv_column_type([2015.0, 2016.0])[0], 'int')
+        self.assertEqual(csv_column_type(['1,5'])[0], 'str')
+        self.assertEqual(
+            csv_column_type(['1,5'], number_format=(',', '.'))[0], 'float')
+        self.assertEqual(csv_column_type(['007', '008'])[0], 'str')
+        self.assertEqual(csv_column_type(['', None])[0], 'str')
+        self.assertEqual(
+            csv_column_type(['2020-01-31', '2020-02-01'])[0], 'date')
+        self.assertEqual(
+            csv_column_type(['1/31/20'], date_formats=['%m/%d/%y'])[0],
+            'date')
+        self.assertEqual(csv_column_type(['a', 'b', 'a', 'a'])[0],
+                         'categorical')
+        self.assertEqual(csv_column_type(['a', 'b', 'c'])[0], 'str')
+
+        _, converter = csv_column_type(['1.000,5'], number_format=(',', '.'))
+        self.assertEqual(converter('1.000,5'), 1000.5)
+        self.assertEqual(converter(''), None)
+
+        # empty values are None in every column type
+        for values in [['a', 'b', 'a', 'a'], ['a', 'b', 'c'], ['', None]]:
+            _, converter = csv_column_type(values)
+            self.assertEqual(converter('a'), 'a')
+            self.assertEqual(converter(''), None)
+
+    def test_csv_number_format(self):
+        """
+        Test csv_number_format
+        """
+        self.assertEqual(
+            csv_number_format([['1.234,56', 'x'], ['2,5', '3']]), (',', '.'))
+        self.assertEqual(
+            csv_number_format([['1,234.56', 'x'], ['2.5', '3']]), ('.', ','))
+        self.assertEqual(csv_number_format([['1.234']]), ('.', ','))
+        self.assertEqual(
+            csv_number_format([['1.234']], [(',', '.'), ('.', ',')]),
+            (',', '.'))
+
     @mock.patch('scrapbag.csvs.open', create=True)
     @mock.patch('scrapbag.files.zipfile.ZipFile')
     @mock.patch('scrapbag.csvs.io.TextIOWrapper')
@@ -139,6 +241,79 @@ class UtilsCSVTestCase(unittest.TestCase):
         result2 = csv_tolist("scrapman/tests/file.zip")
         self.assertEqual(result2, [])
 
+    def test_csv_toiter(self):
+        """
+        Test csv_toiter
+        """
+        path = os.path.join(UTILS_PATH, 'tests/files/csv')
+        csv_testfile = os.path.join(path, 'csv_test.csv')
+
+        result = csv_toiter(csv_testfile)
+        self.assertFalse(isinstance(result, list))
+        self.assertEqual(list(result), csv_tolist(csv_testfile))
+
+        self.assertEqual(list(csv_toiter('not/found/file.csv')), [])
+
+    def test_csv_tolist_parallel(self):
+        """
+        Test csv_tolist_parallel
+        """
+        path = os.path.join(UTILS_PATH, 'tests/files/csv')
+
+        for csv_name in ['csv_test.csv', 'csv_test2.csv', 'csv_test6.csv']:
+            csv_testfile = os.path.join(path, csv_name)
+
+            result = csv_tolist_parallel(
+                csv_testfile, workers=2, range_size=64)
+            self.assertEqual(result, csv_tolist(csv_testfile))
+
+        # quoted newlines are not split
+        with tempfile.NamedTemporaryFile(
+                'w', suffix='.csv', newline='', delete=False) as csv_file:
+            csv_file.write(''.join(
+                'a{0},"b\r\n""{0}""",c\r\n'.format(i) for i in range(50)))
+
+        try:
+            result2 = csv_tolist_parallel(
+                csv_file.name, workers=2, range_size=16)
+            self.assertEqual(len(result2), 50)
+            self.assertEqual(result2[10], ['a10', 'b\n"10"', 'c'])
+            self.assertEqual(result2, csv_tolist(csv_file.name))
+        finally:
+            os.remove(csv_file.name)
+
+        # used as csv_to_dict callback
+        csv_testfile = os.path.join(path, 'csv_test2.csv')
+        self.assertEqual(
+            csv_to_dict(
+                csv_testfile, workers=2, range_size=256,
+                alt_callbacks={'to_list': csv_tolist_parallel}),
+            csv_to_dict(csv_testfile))
+
+        self.assertEqual(csv_tolist_parallel('not/found/file.csv'), [])
+
+    def test_csv_byte_ranges(self):
+        """
+        Test csv_byte_ranges
+        """
+        with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) \
+                as csv_file:
+            csv_file.write(b'a,b\n"c\nd",e\nf,g\nh')
+
+        try:
+            self.assertEqual(
+                list(csv_byte_ranges(csv_file.name, 1)),
+                [(0, 4), (4, 12), (12, 16), (16, 17)])
+            self.assertEqual(
+                list(csv_byte_ranges(csv_file.name, 5)), [(0, 12), (12, 17)])
+            self.assertEqual(
+                list(csv_byte_ranges(csv_file.name, 1, None)),
+                [(0, 4), (4, 7), (7, 12), (12, 16), (16, 17)])
+            self.assertEqual(
+                list(csv_byte_ranges(csv_file.name, 100)), [(0, 17)])
+        finally:
+            os.remove(csv_file.name)
+
     def test_excel_todictlist(self):
         """
         Test excel_todictlist
@@ -164,6 +339,80 @@ class UtilsCSVTestCase(unittest.TestCase):
         self.assertIn(['', 'x', 'y', 'z', 'z'], result2['test_Sheet2'])
         self.assertEqual(len(result2['test_Sheet2'][-1]), 5)
 
+    def test_iter_excel_sheets(self):
+        """
+        Test iter_excel_sheets
+        """
+        path = os.path.join(UTILS_PATH, 'tests/files/xlsx')
+        xls_testfile = os.path.join(path, 'xlsx_test2b.xls')
+
+        result = iter_excel_sheets(xls_testfile)
+        self.assertFalse(isinstance(result, dict))
+        self.assertEqual(
+            list(result), list(excel_todictlist(xls_testfile).items()))
+
+        # sheets selection
+        result2 = list(iter_excel_sheets(
+            xls_testfile, sheets=['test_Sheet3', 'test_Sheet1', 'x']))
+        self.assertEqual(
+            [sheet for sheet, _ in result2], ['test_Sheet1', 'test_Sheet3'])
+        self.assertEqual(
+            result2[1][1], excel_todictlist(xls_testfile)['test_Sheet3'])
+
+        result3 = excel_todictlist(xls_testfile, sheets=['test_Sheet2'])
+        self.assertEqual(list(result3), ['test_Sheet2'])
+
+    def test_xlsx_todictlist(self):
+        """
+        Test xlsx_todictlist
+        """
+        path = os.path.join(UTILS_PATH, 'tests/files/xlsx')
+
+        for xlsx_name in ['xlsx_test1.xlsx', 'xlsx_test2.xlsx']:
+            xlsx_testfile = os.path.join(path, xlsx_name)
+
+            result = xlsx_todictlist(xlsx_testfile)
+            self.assertEqual(result, excel_todictlist(xlsx_testfile))
+            self.assertEqual(
+                list(result), list(excel_todictlist(xlsx_testfile)))
+
+        # merged cells filled like in xlrd
+        result2 = excel_todictlist(
+            os.path.join(path, 'xlsx_test2.xlsx'), backend='xlsx')
+        self.assertIn(['', 'x', 'y', 'z', 'z'], result2['test_Sheet2'])
+
+        # used as excel_to_dict callback, streaming the rows of each sheet
+        xlsx_testfile = os.path.join(path, 'xlsx_test2.xlsx')
+        with mock.patch('scrapbag.csvs.csv_to_dict') as mock_csv_to_dict:
+            result3 = excel_to_dict(
+                xlsx_testfile, result_format=2, backend='xlsx')
+            self.assertFalse(mock_csv_to_dict.called)
+        self.assertEqual(
+            result3, excel_to_dict(xlsx_testfile, result_format=2))
+        self.assertEqual(
+            excel_to_dict(
+                xlsx_testfile, result_format=2,
+                alt_callbacks={'to_dictlist': xlsx_todictlist}),
+            excel_to_dict(xlsx_testfile, result_format=2))
+
+    def test_iter_xlsx_sheets(self):
+        """
+        Test iter_xlsx_sheets
+        """
+        path = os.path.join(UTILS_PATH, 'tests/files/xlsx')
+        xlsx_testfile = os.path.join(path, 'xlsx_test2.xlsx')
+
+        result = list(iter_xlsx_sheets(
+            xlsx_testfile, sheets=['test_Sheet2', 'x']))
+        self.assertEqual([sheet for sheet, _ in result], ['test_Sheet2'])
+
+        # rows are streamed
+        sheets = iter_xlsx_sheets(xlsx_testfile)
+        sheet_name, rows = next(sheets)
+        self.assertFalse(isinstance(rows, list))
+        self.assertEqual(
+            list(rows), excel_todictlist(xlsx_testfile)[sheet_name])
+
     def test_search_mergedcell_value(self):
         """
         Test search_mergedcell_value
@@ -184,6 +433,28 @@ class UtilsCSVTestCase(unittest.TestCase):
         self.assertEqual(search_mergedcell_value(
             mock_cell, (1, 2, 0, 0)), False)
 
+    def test_merged_cells_index(self):
+        """
+        Test merged_cells_index
+        """
+        test = [[1, 2, 3, 4], [4, "", "", 5], [7, "", "", 6], [8, 9, 1, 2]]
+        merged_cells = [(1, 3, 1, 3), (1, 2, 0, 2), (0, 4, 0, 4)]
+        mock_sheet = MockSheet(test, merged_cells)
+
+        result = merged_cells_index(mock_sheet)
+
+        self.assertEqual(len(result), 5)
+        self.assertEqual(result[(1, 1)], (1, 3, 1, 3))
+        self.assertEqual(result[(1, 0)], (1, 2, 0, 2))
+        self.assertNotIn((3, 3), result)
+
+        for row in range(0, mock_sheet.nrows):
+            for column in range(0, mock_sheet.ncols):
+                merged_info = is_merged(mock_sheet, row, column)
+                self.assertEqual(
+                    result.get((row, column)),
+                    merged_info[1] if merged_info else None)
+
     def test_populate_headers(self):
         """
         Test populate_headers
@@ -214,6 +485,57 @@ class UtilsCSVTestCase(unittest.TestCase):
         self.assertEqual(row_iter_limiter(
             [[1], [1, 3, 4], [4, 5, 6]], 0, 1, 0), 1)
 
+    def test_iter_row_csv_limiter(self):
+        """
+        Test iter_row_csv_limiter
+        """
+        rows = [['title'], ['a', 'b'], ['1', '2'], ['3', '4'], ['note']]
+
+        for limits in [None, [], [2], [0, 2], [1, -1], [None, -2], [0, 0]]:
+            self.assertEqual(
+                list(iter_row_csv_limiter(rows, limits)),
+                row_csv_limiter(rows, limits))
+
+        # tail smaller than the rows
+        self.assertEqual(
+            list(iter_row_csv_limiter(iter(rows), tail_size=3)), rows[1:-1])
+
+        # upper limits counted from the end only keep the last rows
+        for limits in [[-2, None], [-3, 4], [-3, 1], [-9, 2], [-3, -1],
+                       [-2, -4]]:
+            self.assertEqual(
+                list(iter_row_csv_limiter(iter(rows), limits)),
+                rows[limits[0]:limits[1]])
+
+    def test_csv_row_cleaner(self):
+        """
+        Test csv_row_cleaner
+        """
+        rows = [['a', 'b'], ['a', 'b'], ['c', ''], ['d', 'd'], ['e', 'f']]
+        self.assertEqual(csv_row_cleaner(rows), [['a', 'b'], ['e', 'f']])
+
+    def test_csv_column_cleaner(self):
+        """
+        Test csv_column_cleaner
+        """
+        rows = [['a', '', 'b'], ['1', '', '2', 'x'], ['3', '', '4']]
+        self.assertEqual(
+            csv_column_cleaner(rows),
+            [['a', 'b'], ['1', '2'], ['3', '4']])
+
+        # short rows and single kept column
+        rows2 = [['a', 'None', None], ['1'], ['3', '', '']]
+        self.assertEqual(csv_column_cleaner(rows2), [['a'], ['1'], ['3']])
+        self.assertEqual(
+            csv_column_cleaner([['a', '', 'b'], ['1', '', '2'], ['3']]),
+            [['a', 'b'], ['1', '2'], ['3', '']])
+
+        # columns checked over a sample
+        rows3 = [['a', '']] * 5 + [['b', 'c']] * 20
+        self.assertEqual(csv_column_cleaner(rows3)[0], ['a', ''])
+        self.assertEqual(
+            csv_column_cleaner(rows3, sample_size=5)[0], ['a'])
+
     def test_csv_format(self):
         """
         Test csv_format
@@ -238,6 +560,115 @@ class UtilsCSVTestCase(unittest.TestCase):
         self.assertEqual(len(result_dict.keys()), 2)
         self.assertEqual(result_bad_resultformat, None)
 
+    def test_csv_columnar_format(self):
+        """
+        Test csv_columnar_format
+        """
+        test_data = [['1', 'a', '1.5'], ['2', 'b', ''], ['3', 'c', '3']]
+
+        result = csv_format(
+            test_data, ['c1', 'c2', 'c3'], ['r1', '', 'r3'], result_format=3)
+
+        self.assertEqual(result['index'], ['r1', '', 'r3'])
+        self.assertEqual(list(result['columns']), ['c1', 'c2', 'c3'])
+        self.assertEqual(result['columns']['c1'], ['1', '2', '3'])
+        self.assertEqual(result['columns']['c3'], ['1.5', '', '3'])
+
+        # empty data keeps the columns
+        self.assertEqual(
+            csv_columnar_format([], ['c1', 'c2'], [])['columns'],
+            {'c1': [], 'c2': []})
+
+    @unittest.skipUnless(numpy is not None, 'numpy is not installed')
+    def test_csv_columnar_format_typed(self):
+        """
+        Test csv_columnar_format typed columns with numpy
+        """
+        test_data = [['1', 'a', '1.5'], ['2', 'b', ''], ['3', 'c', '3']]
+
+        result = csv_columnar_format(
+            test_data, ['c1', 'c2', 'c3'], typed_columns=True)
+
+        self.assertEqual(result['columns']['c1'].dtype, numpy.int64)
+        self.assertEqual(result['columns']['c1'].tolist(), [1, 2, 3])
+        self.assertEqual(result['columns']['c3'].dtype, numpy.float64)
+        self.assertTrue(numpy.isnan(result['columns']['c3'][1]))
+        self.assertEqual(result['columns']['c2'], ['a', 'b', 'c'])
+
+        self.assertEqual(
+            csv_column_array([1.5, 2]).dtype, numpy.float64)
+        self.assertEqual(csv_column_array(['', None]), ['', None])
+
+    @mock.patch('scrapbag.csvs.numpy', None)
+    def test_csv_columnar_format_untyped(self):
+        """
+        Test csv_columnar_format typed columns falling back to lists
+        without numpy
+        """
+        test_data = [['1', 'a', '1.5'], ['2', 'b', ''], ['3', 'c', '3']]
+
+        result = csv_columnar_format(
+            test_data, ['c1', 'c2', 'c3'], typed_columns=True)
+
+        self.assertEqual(
+            result['columns'],
+            {'c1': ['1', '2', '3'], 'c2': ['a', 'b', 'c'],
+             'c3': ['1.5', '', '3']})
+        self.assertTrue(
+            all(type(column) is list for column in result['columns'].values()))
+        self.assertEqual(csv_column_array(('1', '2')), ['1', '2'])
+
+    def test_csv_record_format(self):
+        """
+        Test csv_record_format
+        """
+        test_data = [['1', 'a', '1.5'], ['2', 'b', '']]
+        c_headers = ['c1', 'c2', 'c1']
+
+        result = csv_format(test_data, c_headers, [], result_format=4)[0]
+        record = result[0]
+
+        self.assertEqual(record, dict(zip(c_headers, test_data[0])))
+        self.assertEqual(list(record.items()), [('c1', '1.5'), ('c2', 'a')])
+        self.assertEqual(record['c2'], 'a')
+        self.assertEqual(record.get('c3', 'x'), 'x')
+        self.assertFalse(hasattr(record, '__dict__'))
+        self.assertIs(type(result[1]), csv_record_type(c_headers))
+        self.assertEqual(pickle.loads(pickle.dumps(result)), result)
+
+        # row headers
+        self.assertEqual(
+            csv_format(test_data, ['c1', 'c2', 'c3'], ['r1', ''],
+                       result_format=4),
+            {'r1': {'c1': '1', 'c2': 'a', 'c3': '1.5'}})
+
+        # rows of other length are zipped
+        record_type = csv_record_type(['c1', 'c2'])
+        self.assertEqual(dict(record_type(['1'])), {'c1': '1'})
+        self.assertEqual(
+            dict(record_type(['1', '2', '3'])), {'c1': '1', 'c2': '2'})
+
+        # same rows as the Dict format
+        csv_testfile = os.path.join(
+            UTILS_PATH, 'tests/files/csv/csv_test4.csv')
+        self.assertEqual(
+            csv_to_dict(csv_testfile, result_format=4),
+            csv_to_dict(csv_testfile, result_format=2))
+
+        csv_testfile = os.path.join(UTILS_PATH, 'tests/files/csv/csv_test.csv')
+        self.assertEqual(
+            list(iter_csv_to_dict(csv_testfile, result_format=4)),
+            csv_to_dict(csv_testfile, result_format=2)[0])
+
+        # records are read only mappings, not dicts
+        self.assertFalse(isinstance(record, dict))
+        self.assertIsInstance(record._asdict(), dict)
+        with self.assertRaises(TypeError):
+            record['c1'] = '2'
+
+        with self.assertRaises(ValueError):
+            list(iter_csv_to_dict(csv_testfile, result_format=3))
+
     @mock.patch('scrapbag.csvs.csv_tolist')
     def test_csv_to_dict(self, mock_csv_tolist):
         """
@@ -316,15 +747,76 @@ class UtilsCSVTestCase(unittest.TestCase):
         result7 = csv_to_dict('', rows=[['a', 'b', 'c']], result_format=2)
         self.assertEqual(result7, [[]])
 
+    def test_csv_to_dict_infer_types(self):
+        """
+        Test csv_to_dict and iter_csv_to_dict converting the column types
+        """
+        path = os.path.join(UTILS_PATH, 'tests/files/csv')
+        csv_testfile = os.path.join(path, 'csv_test2.csv')
+
+        result = csv_to_dict(csv_testfile, result_format=2, infer_types=True)
+        self.assertEqual(result[0][0]['TIME'], 2015)
+        self.assertEqual(result[0][0]['Value'], 23981.808)
+        self.assertEqual(result[0][0]['Country'], 'Australia')
+
+        self.assertEqual(
+            list(iter_csv_to_dict(csv_testfile, infer_types=True)),
+            result[0])
+
+        result2 = csv_to_dict(
+            csv_testfile, result_format=3, infer_types=True)
+        self.assertEqual(result2['columns']['TIME'][:2], [2015, 2016])
+
+    def test_iter_csv_to_dict(self):
+        """
+        Test iter_csv_to_dict
+        """
+        path = os.path.join(UTILS_PATH, 'tests/files/csv')
+
+        # perfect square csv yields rows
+        for csv_name in ['csv_test.csv', 'csv_test2.csv']:
+            csv_testfile = os.path.join(path, csv_name)
+            result = iter_csv_to_dict(csv_testfile)
+
+            self.assertFalse(isinstance(result, list))
+            self.assertEqual(
+                list(result), csv_to_dict(csv_testfile, result_format=2)[0])
+
+        # row headers yields (row_header, row) pairs
+        for csv_name in ['csv_test4.csv', 'csv_test5.csv', 'csv_test6.csv']:
+            csv_testfile = os.path.join(path, csv_name)
+            self.assertEqual(
+                dict(iter_csv_to_dict(csv_testfile, tail_size=5)),
+                csv_to_dict(csv_testfile, result_format=2))
+
+        # limits and encoding
+        csv_testfile = os.path.join(path, 'csv_test3.csv')
+        for limits in [[5, -5], None]:
+            self.assertEqual(
+                dict(iter_csv_to_dict(
+                    csv_testfile, encoding='ISO-8859-1', limits=limits)),
+                csv_to_dict(
+                    csv_testfile, result_format=2, encoding='ISO-8859-1',
+                    limits=limits))
+
+        # rows passed
+        rows = csv_tolist(os.path.join(path, 'csv_test.csv'))
+        self.assertEqual(
+            list(iter_csv_to_dict('', rows=iter(rows))),
+            csv_to_dict('', rows=rows, result_format=2)[0])
+
+        with self.assertRaises(ValueError):
+            list(iter_csv_to_dict('', rows=[]))
+
     @mock.patch('scrapbag.csvs.csv_to_dict')
-    @mock.patch('scrapbag.csvs.excel_todictlist')
-    def test_excel_to_dict(self, mock_excel_todictlist, mock_csv_to_dict):
+    @mock.patch('scrapbag.csvs.iter_excel')
+    def test_excel_to_dict(self, mock_iter_excel, mock_csv_to_dict):
         """
         Test excel_to_dict
         """
         path = os.path.join(UTILS_PATH, 'tests/files/xlsx')
 
-        mock_excel_todictlist.side_effect = excel_todictlist
+        mock_iter_excel.side_effect = iter_excel
         mock_csv_to_dict.side_effect = csv_to_dict
 
         # xlsx file
@@ -390,8 +882,47 @@ class UtilsCSVTestCase(unittest.TestCase):
                 path_encapsulated, {}).get('test_Sheet3', 'not_found_key'),
             csv_to_dict)
 
-        mock_excel_todictlist.side_effect = Exception('Err')
+        # sheets are parsed one at a time as they are loaded
+        events = []
+
+        def to_iter(path_to_file, **kwargs):
+            for sheet in ['s1', 's2']:
+                events.append('load ' + sheet)
+                yield sheet, iter([['a'], ['1']])
+
+        mock_csv_to_dict.side_effect = \
+            lambda path, **kwargs: events.append('parse') or kwargs['rows']
+        self.assertEqual(
+            excel_to_dict('test.xlsx', alt_callbacks={'to_iter': to_iter}),
+            {'s1': [['a'], ['1']], 's2': [['a'], ['1']]})
+        self.assertEqual(events, ['load s1', 'parse', 'load s2', 'parse'])
+
+        mock_iter_excel.side_effect = Exception('Err')
         result8_exception = excel_to_dict(
             os.path.join(path, 'xlsx_test2b.xls'),
             encapsulate_filepath=True, result_format=2)
         self.assertEqual(result8_exception, {})
+
+    def test_excel_to_dict_workers(self):
+        """
+        Test excel_to_dict parsing sheets in worker processes
+        """
+        path = os.path.join(UTILS_PATH, 'tests/files/xlsx')
+
+        for xlsx_name in ['xlsx_test1.xlsx', 'xlsx_test2b.xls']:
+            xlsx_testfile = os.path.join(path, xlsx_name)
+
+            result = excel_to_dict(xlsx_testfile, result_format=2)
+            result_workers = excel_to_dict(
+                xlsx_testfile, result_format=2, workers=2)
+
+            self.assertEqual(result_workers, result)
+            self.assertEqual(list(result_workers), list(result))
+
+        # sheets failing in the workers are isolated
+        result_fail = excel_to_dict(
+            os.path.join(path, 'xlsx_test2b.xls'), result_format=2,
+            workers=2, limits=['bad', 'limits'])
+
+        self.assertEqual(len(result_fail), 4)
+        self.assertTrue(all(x == [] for x in result_fail.values()))
@@ -41,4 +41,8 @@ setup(
         'Programming Language :: Python :: 3.5'
     ],
     install_requires=required,
+    extras_require={
+        # typed columns of the columnar csv format
+        'numpy': ['numpy>=1.12'],
+    },
 )